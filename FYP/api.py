@@ -1,25 +1,25 @@
 import os
-import csv
-import difflib
+import json
+import asyncio
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI
-from fastapi import Query
-from pydantic import BaseModel
+from fastapi import Query, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv, find_dotenv
-
-# ✅ LIGHTWEIGHT IMPORTS
-from langchain_community.vectorstores import FAISS
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.tools import tool
-from langchain.agents import create_tool_calling_agent, AgentExecutor
-from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmbeddings, HarmBlockThreshold, HarmCategory
+
+# ✅ LIGHTWEIGHT IMPORTS: models, index, directory and tools live in medibot_core
 from langchain_core.messages import HumanMessage, AIMessage 
+from medibot_core import (
+    TOOLS, create_agent_executor, get_doctor_directory, get_classifier, get_vectorstore, infer_specialty,
+    likely_tool_calls, embed_disease_queries, speculate, get_watcher, llm_priority, rollback,
+)
 
 # =============================
 # 1. Config & Setup
 # =============================
-load_dotenv(find_dotenv())
-
 app = FastAPI()
 
 app.add_middleware(
@@ -30,203 +30,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
-
-# 🟢 FIXED: Use the standard stable model
-AGENT_MODEL = "gemini-flash-latest"
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-VECTORSTORE_PATH = os.path.join(BASE_DIR, "vectorstore", "db_faiss")
-DOCTORS_CSV = os.path.join(BASE_DIR, "data", "doctors.csv")
+chat_history = [] 
+chat_history_lock = threading.Lock()  # concurrent /chat requests share the history
 
-# Disable Safety Filters
-SAFETY_SETTINGS = {
-    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-}
+# Batch endpoints
+BATCH_MAX_ITEMS = 500
+CHAT_BATCH_CONCURRENCY = int(os.environ.get("CHAT_BATCH_CONCURRENCY", "4"))
 
-chat_history = [] 
+# Admin endpoints are disabled unless a token is set (sent as the X-Admin-Token header)
+ADMIN_TOKEN = os.environ.get("MEDIBOT_ADMIN_TOKEN")
 
 # =============================
 # Specialty inference (deterministic, symptom-first)
 # =============================
 
-SPECIALTY_KEYWORDS = {
-    "Cardiologist": [
-        "chest pain", "chest tight", "chest pressure", "heart", "palpitation", "cardiac",
-        "high blood pressure", "hypertension", "shortness of breath", "angina"
-    ],
-    "Pulmonologist": [
-        "breathing", "breath", "wheezing", "asthma", "cough", "lungs", "copd", "pneumonia"
-    ],
-    "Neurologist": [
-        "headache", "migraine", "seizure", "stroke", "numb", "tingling", "dizziness"
-    ],
-    "Dentist": [
-        "tooth", "teeth", "toothache", "gum", "cavity", "jaw pain"
-    ],
-    "Dermatologist": [
-        "skin", "rash", "acne", "eczema", "itch", "hives"
-    ],
-    "ENT Specialist": [
-        "ear", "throat", "tonsil", "sinus", "nose", "hearing", "ear pain"
-    ],
-    "Orthopedic Surgeon": [
-        "knee", "joint", "bone", "fracture", "back pain", "shoulder", "sprain"
-    ],
-    "Gynecologist": [
-        "pregnancy", "period", "menstrual", "vaginal", "pelvic pain"
-    ],
-    "Pediatrician": [
-        "baby", "infant", "child", "kid", "vaccination"
-    ],
-    "Urologist": [
-        "urine", "urinary", "kidney", "bladder", "prostate"
-    ],
-    "Endocrinologist": [
-        "diabetes", "thyroid", "hormone"
-    ],
-    "Psychiatrist": [
-        "anxiety", "depression", "panic", "stress", "insomnia"
-    ],
-}
-
+# Trained offline from data/diseases.txt (see medibot_core/specialty_classifier.py); no torch needed.
 def infer_specialty_from_text(text: str) -> str | None:
-    if not text:
-        return None
-    t = text.lower()
-    # Prefer more serious / high-priority matches first by ordering in dict above
-    for specialty, keywords in SPECIALTY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in t:
-                return specialty
-    return None
-
-
-def _read_doctors_csv() -> list[dict]:
-    with open(DOCTORS_CSV, mode="r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = []
-        for r in reader:
-            # normalize priority to int if possible
-            try:
-                r["priority"] = int(r.get("priority", 0))
-            except Exception:
-                r["priority"] = 0
-            rows.append(r)
-        return rows
+    return infer_specialty(text)
 
 
 def find_doctors_from_csv(specialty: str | None = None, city: str | None = None, limit: int = 20) -> list[dict]:
-    specialty_in = (specialty or "").strip().lower()
-    city_in = (city or "").strip().lower()
-
-    rows = _read_doctors_csv()
-
-    # Fuzzy match city if provided
-    if city_in:
-        all_cities = {r.get("city", "").lower() for r in rows if r.get("city")}
-        if city_in not in all_cities:
-            matches = difflib.get_close_matches(city_in, list(all_cities), n=1, cutoff=0.6)
-            if matches:
-                city_in = matches[0]
-
-    out = []
-    for r in rows:
-        r_city = (r.get("city") or "").lower()
-        r_spec = (r.get("specialty") or "").lower()
-        if specialty_in and specialty_in not in r_spec:
-            continue
-        if city_in and city_in != r_city:
-            continue
-        out.append(r)
-
-    out.sort(key=lambda x: -int(x.get("priority", 0)))
-    return out[: max(1, min(limit, 100))]
-
-# =============================
-# 2. Load Models
-# =============================
-# 🟢 FIXED: Use the standard stable embedding model
-embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
-
-try:
-    vectorstore = FAISS.load_local(VECTORSTORE_PATH, embeddings, allow_dangerous_deserialization=True)
-    retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-except Exception as e:
-    print(f"Warning: Could not load vectorstore. Error: {e}")
-    retriever = None
+    return get_doctor_directory().find(specialty, city, limit)
 
 # =============================
-# 3. Tools
+# 2. Load Models (shared singletons, loaded at startup rather than on the first request)
 # =============================
+get_classifier()
+get_doctor_directory()
+get_vectorstore()
 
-@tool
-def doctor_lookup(user_specialty: str, city: str) -> dict:
-    """Find a doctor by specialty and city from the database. Handles spelling errors."""
-    if not user_specialty or not city:
-        return {"error": "Please provide both specialty and city."}
 
-    city_in = city.lower().strip()
-    spec_in = user_specialty.lower().strip()
-    
-    results = []
-    all_cities = set() 
-
-    try:
-        with open(DOCTORS_CSV, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            rows = list(reader)
-            
-            for row in rows:
-                if row['city']:
-                    all_cities.add(row['city'].lower())
-
-            # Fuzzy Match City
-            if city_in not in all_cities:
-                matches = difflib.get_close_matches(city_in, list(all_cities), n=1, cutoff=0.6)
-                if matches:
-                    city_in = matches[0]
-
-            for row in rows:
-                if spec_in in row['specialty'].lower() and city_in == row['city'].lower():
-                    results.append(row)
-
-        if not results:
-            return {"error": f"No {user_specialty} found in {city_in.title()}."}
-
-        rec_text = f"Found matches in {city_in.title()}:\n"
-        for r in results[:3]:
-            phone = r.get('phone', 'N/A')
-            rec_text += f"- {r['name']} ({r['address']}) - 📞 {phone}\n"
-        
-        # Return clean specialty for button logic
-        found_specialty = results[0]['specialty'] if results else user_specialty
-        return {"recommendations": rec_text, "specialty_found": found_specialty}
-
-    except Exception as e:
-        return {"error": str(e)}
-
-@tool
-def disease_info(query: str) -> str:
-    """Find disease info from the encyclopedia."""
-    if not retriever: return "Knowledge base not loaded."
-    docs = retriever.invoke(query)
-    if not docs: return "I checked the encyclopedia but found no information."
-    return f"**From Encyclopedia:**\n{docs[0].page_content}"
-
-@tool
-def list_diseases() -> str:
-    """Returns a list of diseases found in the uploaded Encyclopedia."""
-    return "I can discuss diseases found in the uploaded Encyclopedia."
+@app.on_event("startup")
+async def start_resource_watcher():
+    # Picks up a rebuilt vectorstore / edited doctors.csv without restarting workers
+    app.state.resource_watcher = asyncio.create_task(get_watcher().run_async())
 
 # =============================
-# 4. Initialize Agent
+# 3. Initialize Agent
 # =============================
-llm = ChatGoogleGenerativeAI(model=AGENT_MODEL, google_api_key=GOOGLE_API_KEY, safety_settings=SAFETY_SETTINGS)
-tools = [doctor_lookup, disease_info, list_diseases]
-
 system_prompt = """
 You are Medibot, an empathetic AI medical assistant. 
 
@@ -238,38 +79,35 @@ You are Medibot, an empathetic AI medical assistant.
 3. If the user describes symptoms, ask clarification questions first.
 """
 
-agent_prompt = ChatPromptTemplate.from_messages([
-    ("system", system_prompt),
-    MessagesPlaceholder(variable_name="chat_history"),
-    ("human", "{input}"),
-    ("placeholder", "{agent_scratchpad}"),
-])
-
-agent = create_tool_calling_agent(llm, tools, agent_prompt)
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True)
+agent_executor = create_agent_executor(system_prompt, TOOLS)
+chat_batch_pool = ThreadPoolExecutor(max_workers=CHAT_BATCH_CONCURRENCY, thread_name_prefix="chat-batch")
 
 # =============================
-# 5. API Endpoint
+# 4. API Endpoint
 # =============================
 class UserQuery(BaseModel):
     message: str
 
+def _run_agent(message: str, history: list, query_vectors: dict | None = None) -> str:
+    # Start the likely tool work (retrieval / directory lookup) while Gemini plans
+    with speculate(likely_tool_calls(message, query_vectors)):
+        response = agent_executor.invoke({"input": message, "chat_history": history})
+    return response.get("output", "I could not process that.")
+
+
 @app.post("/chat")
 async def chat_endpoint(query: UserQuery):
     try:
-        global chat_history
-        if len(chat_history) > 10:
-            chat_history = chat_history[-10:]
+        with chat_history_lock:
+            del chat_history[:-10]
+            history = list(chat_history)
 
-        response = agent_executor.invoke({
-            "input": query.message,
-            "chat_history": chat_history 
-        })
-        
-        output_text = response.get("output", "I could not process that.")
+        # The agent blocks (LLM rate limiting, retries), so keep it off the event loop
+        output_text = await asyncio.to_thread(_run_agent, query.message, history)
 
-        chat_history.append(HumanMessage(content=query.message))
-        chat_history.append(AIMessage(content=output_text))
+        # Append the exchange as one unit so concurrent turns never interleave
+        with chat_history_lock:
+            chat_history.extend([HumanMessage(content=query.message), AIMessage(content=output_text)])
 
         # IMPORTANT: infer specialty from the *user message* (deterministic),
         # not from whatever the LLM happened to mention in its response.
@@ -290,4 +128,93 @@ def doctors_endpoint(
 ):
     """Return doctors from FYP/data/doctors.csv (independent of Firebase registrations)."""
     docs = find_doctors_from_csv(specialty=specialty, city=city, limit=limit)
-    return {"doctors": docs, "count": len(docs), "specialty": specialty, "city": city}
\ No newline at end of file
+    return {"doctors": docs, "count": len(docs), "specialty": specialty, "city": city}
+
+
+class DoctorQuery(BaseModel):
+    specialty: str | None = None
+    city: str | None = None
+    limit: int = Field(default=20, ge=1, le=100)
+
+
+class DoctorBatch(BaseModel):
+    queries: list[DoctorQuery]
+
+
+class ChatBatch(BaseModel):
+    messages: list[str]
+
+
+def _ndjson(lines):
+    for line in lines:
+        yield json.dumps(line) + "\n"
+
+
+def _check_batch_size(n: int):
+    if n > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {BATCH_MAX_ITEMS} items).")
+
+
+@app.post("/doctors/batch")
+def doctors_batch_endpoint(batch: DoctorBatch):
+    """Resolve many doctor lookups at once. Streams one NDJSON line per query, in input order."""
+    _check_batch_size(len(batch.queries))
+    results = get_doctor_directory().find_batch([(q.specialty, q.city, q.limit) for q in batch.queries])
+    lines = (
+        {"index": i, "doctors": docs, "count": len(docs), "specialty": q.specialty, "city": q.city}
+        for i, (q, docs) in enumerate(zip(batch.queries, results))
+    )
+    return StreamingResponse(_ndjson(lines), media_type="application/x-ndjson")
+
+
+def _answer_stateless(message: str, query_vectors: dict) -> dict:
+    # Batch messages are independent queries: no shared chat history.
+    # They queue behind interactive /chat calls for the LLM quota.
+    try:
+        with llm_priority("batch"):
+            output_text = _run_agent(message, [], query_vectors)
+        return {"text": output_text, "specialty": infer_specialty_from_text(message)}
+    except Exception as e:
+        print(f"Error: {e}")
+        return {"text": "Error processing your request.", "specialty": None}
+
+
+@app.post("/chat/batch")
+async def chat_batch_endpoint(batch: ChatBatch):
+    """Answer many messages at once. Identical messages are answered once; agent calls run
+    with bounded parallelism (CHAT_BATCH_CONCURRENCY). Streams NDJSON in input order."""
+    _check_batch_size(len(batch.messages))
+    messages = list(dict.fromkeys(batch.messages))
+    try:
+        # Every disease question in the batch is embedded in one request before the agents start
+        query_vectors = await asyncio.to_thread(embed_disease_queries, messages)
+    except Exception as e:
+        print(f"Error: {e}")
+        query_vectors = {}  # each disease_info call embeds its own query
+    futures = {m: chat_batch_pool.submit(_answer_stateless, m, query_vectors) for m in messages}
+
+    async def lines():
+        try:
+            for i, m in enumerate(batch.messages):
+                yield json.dumps({"index": i, **await asyncio.wrap_future(futures[m])}) + "\n"
+        finally:
+            # Client gone (or done): messages that haven't started are never sent to the agent
+            for fut in futures.values():
+                fut.cancel()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/admin/rollback/{resource}")
+def rollback_endpoint(resource: str, x_admin_token: str | None = Header(default=None)):
+    """Swap "vectorstore" or "doctors" back to the previously loaded version in this worker
+    (until its files change again)."""
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required.")
+    try:
+        rolled_back = rollback(resource)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown resource {resource!r}.")
+    if not rolled_back:
+        raise HTTPException(status_code=409, detail=f"No previous {resource} version to roll back to.")
+    return {"resource": resource, "rolled_back": True, "pid": os.getpid()}
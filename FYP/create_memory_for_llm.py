@@ -4,14 +4,16 @@ from dotenv import load_dotenv
 from langchain_community.document_loaders import TextLoader, DirectoryLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
-from langchain_google_genai import GoogleGenerativeAIEmbeddings
 import google.api_core.exceptions
+from medibot_core import get_embeddings
+from medibot_core.config import BASE_DIR, EMBEDDING_BACKEND, VECTORSTORE_PATH, DOCSTORE_SNAPSHOT
+from medibot_core.docstore import build_docstore_snapshot
 
 load_dotenv()
 GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
 
-DATA_PATH = "data/"
-DB_FAISS_PATH = "vectorstore/db_faiss"
+DATA_PATH = os.path.join(BASE_DIR, "data")
+DB_FAISS_PATH = VECTORSTORE_PATH
 
 def create_vector_db():
     print("📂 Loading diseases.txt...")
@@ -24,12 +26,12 @@ def create_vector_db():
     print(f"📊 Total Chunks: {len(texts)}")
 
     print("🔌 Connecting to Google Cloud...")
-    if not GOOGLE_API_KEY:
+    if EMBEDDING_BACKEND == "google" and not GOOGLE_API_KEY:
         print("❌ Error: GOOGLE_API_KEY not found in .env file")
         return
 
-    # 🟢 FIXED: Use standard stable embedding model
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001")
+    # Same embedding backend the apps query with (medibot_core.config.EMBEDDING_BACKEND)
+    embeddings = get_embeddings()
 
     # 🟢 ULTRA-SAFE MODE: 1 Chunk at a time
     vector_db = None
@@ -64,7 +66,18 @@ def create_vector_db():
                 break
 
     if vector_db:
-        vector_db.save_local(DB_FAISS_PATH)
+        # Save next to the live index, then swap the files in so running apps
+        # (which hot-reload on change) never read a half-written index.
+        tmp_path = DB_FAISS_PATH + ".tmp"
+        vector_db.save_local(tmp_path)
+        os.makedirs(DB_FAISS_PATH, exist_ok=True)
+        for name in ("index.faiss", "index.pkl"):
+            os.replace(os.path.join(tmp_path, name), os.path.join(DB_FAISS_PATH, name))
+        os.rmdir(tmp_path)
+        # Columnar copy of the docstore so apps can mmap it instead of unpickling index.pkl.
+        # Written as a new version (see snapshot.py), never over a file an app has mapped;
+        # until it is in place, apps see the old one as out of date and read index.pkl.
+        build_docstore_snapshot(os.path.join(DB_FAISS_PATH, "index.pkl"), DOCSTORE_SNAPSHOT)
         print("\n✅ Success! Memory created without crashing.")
     else:
         print("\n❌ Failed to create memory.")
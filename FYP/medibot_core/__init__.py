@@ -0,0 +1,15 @@
+"""Shared resources and tools for the Medibot front-ends.
+
+api.py (FastAPI), medibot.py (Streamlit) and connect_memory_with_llm.py (CLI) are thin
+adapters over this package, so each process loads one embedder, one vectorstore, one LLM
+client and one doctor directory, lazily, on first use.
+"""
+from .resources import (
+    get_embeddings, embed_queries, get_vectorstore, get_retriever, get_llm, get_llm_gateway,
+    get_qa_chain,
+    get_doctor_directory, get_classifier, get_disease_names, infer_specialty, create_agent_executor,
+    get_watcher, rollback,
+)
+from .llm_gateway import llm_priority
+from .speculation import speculate
+from .tools import doctor_lookup, disease_info, list_diseases, extract_disease_name, likely_tool_calls, embed_disease_queries, TOOLS
@@ -0,0 +1,51 @@
+import os
+from dotenv import load_dotenv, find_dotenv
+from langchain_google_genai import HarmBlockThreshold, HarmCategory
+
+# =============================
+# Environment & Paths
+# =============================
+load_dotenv(find_dotenv())
+
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VECTORSTORE_PATH = os.path.join(BASE_DIR, "vectorstore", "db_faiss")
+DOCTORS_CSV = os.path.join(BASE_DIR, "data", "doctors.csv")
+# Compiled by `python -m medibot_core.snapshot`; used instead of the sources when up to date.
+DOCTORS_SNAPSHOT = os.path.join(BASE_DIR, "data", "doctors.snap")
+DOCSTORE_SNAPSHOT = os.path.join(VECTORSTORE_PATH, "docstore.snap")
+DISEASES_TXT = os.path.join(BASE_DIR, "data", "diseases.txt")
+CLASSIFIER_PATH = os.path.join(BASE_DIR, "models", "specialty_classifier.npz")
+
+# =============================
+# Models
+# =============================
+AGENT_MODEL = os.environ.get("MEDIBOT_AGENT_MODEL", "gemini-flash-latest")
+# Alternative Gemini API endpoint (e.g. a local fake server for testing); uses REST transport.
+LLM_ENDPOINT = os.environ.get("MEDIBOT_LLM_ENDPOINT")
+
+# "google" (Gemini embedding API) or "local" (sentence-transformer worker process).
+# The vectorstore must be built with the same backend (create_memory_for_llm.py uses this too).
+EMBEDDING_BACKEND = os.environ.get("MEDIBOT_EMBEDDINGS", "google")
+GOOGLE_EMBEDDING_MODEL = "models/embedding-001"
+LOCAL_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+RETRIEVER_K = 5
+
+# Disable Safety Filters
+SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+QA_PROMPT_TEMPLATE = """
+You are a professional medical assistant. Answer the following medical question based ONLY on the provided context. Be informative, accurate, and professional. If the context does not contain relevant information about the query, respond with "I don't know" and do not make up information.
+
+Context: {context}
+Question: {input}
+
+Answer:
+"""
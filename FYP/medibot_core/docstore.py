@@ -0,0 +1,62 @@
+import json
+import pickle
+from collections.abc import Mapping
+
+from langchain_community.docstore.base import Docstore
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.faiss import dependable_faiss_import
+from langchain_core.documents import Document
+
+from .snapshot import Snapshot, write_snapshot
+
+
+def build_docstore_snapshot(index_pkl: str, out_path: str):
+    """Compile a saved FAISS docstore (index.pkl) into a snapshot, one row per FAISS vector."""
+    with open(index_pkl, "rb") as f:
+        docstore, index_to_docstore_id = pickle.load(f)
+    docs = [docstore.search(index_to_docstore_id[i]) for i in range(len(index_to_docstore_id))]
+    strings = {
+        "text": [d.page_content for d in docs],
+        "metadata": [json.dumps(d.metadata, default=str) for d in docs],
+    }
+    write_snapshot(out_path, "docstore", {}, strings, source=index_pkl)
+
+
+class _RowIds(Mapping):
+    """index_to_docstore_id for a snapshot docstore: FAISS row i -> docstore id i."""
+
+    def __init__(self, n: int):
+        self.n = n
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise KeyError(i)
+        return int(i)
+
+    def __iter__(self):
+        return iter(range(self.n))
+
+    def __len__(self):
+        return self.n
+
+
+class SnapshotDocstore(Docstore):
+    """Read-only docstore over a "docstore" snapshot. Documents are decoded when searched."""
+
+    def __init__(self, snapshot: Snapshot):
+        self.text = snapshot["text"]
+        self.metadata = snapshot["metadata"]
+
+    def search(self, search: int) -> Document | str:
+        if not 0 <= search < len(self.text):
+            return f"ID {search} not found."
+        return Document(page_content=self.text[search], metadata=json.loads(self.metadata[search]))
+
+
+def load_faiss_from_snapshot(index_path: str, snapshot: Snapshot, embeddings) -> FAISS:
+    """FAISS vectorstore from index.faiss plus a docstore snapshot (instead of index.pkl)."""
+    index = dependable_faiss_import().read_index(index_path)
+    docstore = SnapshotDocstore(snapshot)
+    if index.ntotal != len(docstore.text):
+        raise ValueError(f"docstore snapshot has {len(docstore.text)} rows, index has {index.ntotal}")
+    return FAISS(embeddings, index, docstore, _RowIds(index.ntotal))
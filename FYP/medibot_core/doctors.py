@@ -0,0 +1,198 @@
+import re
+import csv
+import difflib
+
+import numpy as np
+
+from .snapshot import Snapshot, write_snapshot
+
+
+def _read_doctors_csv(path: str) -> list[dict]:
+    with open(path, mode="r", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = []
+        for r in reader:
+            # normalize priority to int if possible
+            try:
+                r["priority"] = int(r.get("priority", 0))
+            except Exception:
+                r["priority"] = 0
+            rows.append(r)
+        return rows
+
+
+def priority_label(priority: int) -> str:
+    if priority >= 5:
+        return "Most Recommended"
+    if priority == 4:
+        return "Recommended"
+    if priority == 3:
+        return "Good Option"
+    return "Available"
+
+
+def _intern(values: list[str]) -> tuple[list[str], np.ndarray]:
+    table, codes = {}, np.empty(len(values), dtype=np.uint32)
+    for i, v in enumerate(values):
+        codes[i] = table.setdefault(v, len(table))
+    return list(table), codes
+
+
+def _columns(rows: list[dict]) -> tuple[dict, dict]:
+    """Directory columns (arrays, strings): rows in priority order, plus a by-city row index."""
+    rows = sorted(rows, key=lambda x: -x["priority"])  # stable: keeps CSV order within a priority
+    specialty_names, specialty_codes = _intern([r.get("specialty") or "" for r in rows])
+    city_names, city_codes = _intern([r.get("city") or "" for r in rows])
+    city_order = np.argsort(city_codes, kind="stable").astype(np.uint32)  # priority order within a city
+    city_starts = np.searchsorted(city_codes[city_order], np.arange(len(city_names) + 1)).astype(np.uint32)
+    arrays = {
+        "priority": np.clip([r["priority"] for r in rows], -128, 127).astype(np.int8),
+        "specialty": specialty_codes,
+        "city": city_codes,
+        "city_order": city_order,
+        "city_starts": city_starts,
+    }
+    strings = {
+        "name": [r.get("name") or "" for r in rows],
+        "address": [r.get("address") or "" for r in rows],
+        "phone": [r.get("phone") or "" for r in rows],
+        "specialty_names": specialty_names,
+        "city_names": city_names,
+    }
+    return arrays, strings
+
+
+def build_doctors_snapshot(csv_path: str, out_path: str):
+    """Compile the doctors CSV into a snapshot (see snapshot.py)."""
+    arrays, strings = _columns(_read_doctors_csv(csv_path))
+    write_snapshot(out_path, "doctors", arrays, strings, source=csv_path)
+
+
+class DoctorDirectory:
+    """Doctor directory over columns: rows in priority order (desc), specialty and city interned.
+
+    Built from the CSV, or used in place from a memory-mapped snapshot. Row dicts are only
+    built for lookup results.
+    """
+
+    def __init__(self, columns):
+        self.priority = columns["priority"]
+        self.specialty_codes = columns["specialty"]
+        self.city_codes = columns["city"]
+        self.city_order = columns["city_order"]
+        self.city_starts = columns["city_starts"]
+        self.names = columns["name"]
+        self.addresses = columns["address"]
+        self.phones = columns["phone"]
+        # Interned tables are small; decode them once.
+        self.specialty_names = list(columns["specialty_names"])
+        self.city_names = list(columns["city_names"])
+
+        self._city_codes = {}  # lowercased city -> codes
+        for code, c in enumerate(self.city_names):
+            if c:
+                self._city_codes.setdefault(c.lower(), []).append(code)
+        self.cities = sorted(self._city_codes)
+        self.specialties = sorted({s for s in self.specialty_names if s})
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "DoctorDirectory":
+        arrays, strings = _columns(rows)
+        return cls({**arrays, **strings})
+
+    @classmethod
+    def from_csv(cls, path: str) -> "DoctorDirectory":
+        return cls.from_rows(_read_doctors_csv(path))
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Snapshot) -> "DoctorDirectory":
+        return cls(snapshot)
+
+    def __len__(self):
+        return len(self.priority)
+
+    def row(self, i: int) -> dict:
+        return {
+            "name": self.names[i],
+            "specialty": self.specialty_names[self.specialty_codes[i]],
+            "city": self.city_names[self.city_codes[i]],
+            "address": self.addresses[i],
+            "phone": self.phones[i],
+            "priority": int(self.priority[i]),
+        }
+
+    def resolve_city(self, city: str | None) -> str:
+        """Lowercased city, fuzzy-matched to a known city when it isn't one."""
+        city_in = (city or "").strip().lower()
+        if city_in and city_in not in self._city_codes:
+            matches = difflib.get_close_matches(city_in, self.cities, n=1, cutoff=0.6)
+            if matches:
+                return matches[0]
+        return city_in
+
+    def match_specialty(self, text: str | None) -> str | None:
+        """Directory specialty named by `text`: exact, or a word prefix ("cardio" -> "Cardiologist")."""
+        t = (text or "").strip().lower()
+        if not t:
+            return None
+        for s in self.specialties:
+            if t == s.lower():
+                return s
+        for s in self.specialties:
+            if s.lower().startswith(t) or any(w.startswith(t) for w in s.lower().split()):
+                return s
+        return None
+
+    def city_in_text(self, text: str) -> str | None:
+        """First known city mentioned as whole words in free text ("doctor in lahore?" -> "lahore")."""
+        padded = " " + re.sub(r"[^a-z0-9]+", " ", (text or "").lower()) + " "
+        for c in self.cities:
+            if f" {c} " in padded:
+                return c
+        return None
+
+    def _specialty_codes_matching(self, specialty_in: str) -> list[int]:
+        return [code for code, s in enumerate(self.specialty_names) if specialty_in in s.lower()]
+
+    def _rows_in_city(self, city_in: str) -> np.ndarray:
+        """Row numbers in `city_in`, in priority order."""
+        parts = [self.city_order[self.city_starts[c]:self.city_starts[c + 1]] for c in self._city_codes.get(city_in, [])]
+        if not parts:
+            return np.empty(0, dtype=np.uint32)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+    def cities_for(self, specialty: str) -> list[str]:
+        rows = np.isin(self.specialty_codes, self._specialty_codes_matching(specialty.lower()))
+        return sorted({self.city_names[c].title() for c in np.unique(self.city_codes[rows])})
+
+    def find_batch(self, queries: list[tuple[str | None, str | None, int]]) -> list[list[dict]]:
+        """Resolve many (specialty, city, limit) lookups.
+
+        Identical lookups (after normalization and city fuzzy-matching) are resolved once, and a
+        lookup with a city only scans that city's rows. Results are returned in input order.
+        """
+        unique = {}  # (specialty, city, limit) -> slot
+        slots = []
+        for specialty, city, limit in queries:
+            key = ((specialty or "").strip().lower(), self.resolve_city(city), max(1, min(limit, 100)))
+            if key not in unique:
+                unique[key] = len(unique)
+            slots.append(unique[key])
+
+        results = []
+        for specialty_in, city_in, limit in unique:
+            # Row numbers are priority-ordered, so the first `limit` matches are the best ones.
+            rows = self._rows_in_city(city_in) if city_in else None
+            if specialty_in:
+                codes = self._specialty_codes_matching(specialty_in)
+                spec = self.specialty_codes if rows is None else self.specialty_codes[rows]
+                hits = np.flatnonzero(np.isin(spec, codes))[:limit]
+                rows = hits if rows is None else rows[hits]
+            elif rows is None:
+                rows = np.arange(min(limit, len(self)))
+            results.append([self.row(i) for i in rows[:limit]])
+
+        return [results[slot] for slot in slots]
+
+    def find(self, specialty: str | None = None, city: str | None = None, limit: int = 20) -> list[dict]:
+        return self.find_batch([(specialty, city, limit)])[0]
@@ -0,0 +1,173 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import multiprocessing as mp
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+# =============================
+# Config
+# =============================
+# torch threads used by the worker process (keep small so it does not starve Streamlit)
+EMBED_THREADS = int(os.environ.get("MEDIBOT_EMBED_THREADS", "2"))
+# How long the worker waits for more encode requests before running a forward pass
+WORKER_BATCH_WINDOW = float(os.environ.get("MEDIBOT_EMBED_BATCH_WINDOW_MS", "5")) / 1000
+EMBED_MAX_BATCH = int(os.environ.get("MEDIBOT_EMBED_MAX_BATCH", "64"))
+EMBED_TIMEOUT = 60  # seconds
+
+
+# =============================
+# Worker process
+# =============================
+def _load_sentence_transformer(model_name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device="cpu")
+
+
+def _worker_main(load_model, model_name, num_threads, window, max_batch, requests, responses):
+    """Loads the model once, then micro-batches queued requests into single encode calls."""
+    import torch
+    torch.set_num_threads(num_threads)
+
+    model = load_model(model_name)
+    running = True
+
+    while running:
+        item = requests.get()
+        if item is None:
+            break
+
+        # Collect whatever else arrives within the window into the same forward pass
+        batch = [item]
+        size = len(item[1])
+        deadline = time.monotonic() + window
+        while size < max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                nxt = requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if nxt is None:
+                running = False
+                break
+            batch.append(nxt)
+            size += len(nxt[1])
+
+        texts = [t for _, req_texts in batch for t in req_texts]
+        try:
+            vectors = model.encode(texts, batch_size=max(len(texts), 1), convert_to_numpy=True)
+        except Exception as e:
+            for req_id, _ in batch:
+                responses.put((req_id, None, str(e)))
+            continue
+
+        offset = 0
+        for req_id, req_texts in batch:
+            responses.put((req_id, vectors[offset:offset + len(req_texts)], None))
+            offset += len(req_texts)
+
+
+# =============================
+# Client
+# =============================
+class EmbeddingWorker:
+    """Runs SentenceTransformer.encode in a dedicated warm process.
+
+    Calls from any thread are queued; the worker merges concurrent calls into one
+    forward pass, so encoding never holds the caller's GIL. `load_model(model_name)`
+    runs in the worker and must be picklable (a module-level function or class).
+    """
+
+    def __init__(self, model_name: str, num_threads: int = EMBED_THREADS,
+                 window: float = WORKER_BATCH_WINDOW, max_batch: int = EMBED_MAX_BATCH,
+                 load_model=_load_sentence_transformer):
+        ctx = mp.get_context("spawn")
+        self._requests = ctx.Queue()
+        self._responses = ctx.Queue()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(load_model, model_name, num_threads, window, max_batch, self._requests, self._responses),
+            daemon=True,
+        )
+        self._process.start()
+
+        self._ids = itertools.count()
+        self._pending = {}
+        self._dead = None  # set once the worker is gone; later encode() calls fail fast
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def _read_responses(self):
+        while True:
+            try:
+                req_id, vectors, error = self._responses.get(timeout=1)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    self._fail_pending(RuntimeError("Embedding worker process exited."))
+                    return
+                continue
+            with self._lock:
+                fut = self._pending.pop(req_id, None)
+            if fut is None:
+                continue
+            if error:
+                fut.set_exception(RuntimeError(f"Embedding worker error: {error}"))
+            else:
+                fut.set_result(vectors)
+
+    def _fail_pending(self, error: Exception):
+        with self._lock:
+            self._dead = error
+            pending, self._pending = self._pending, {}
+        for fut in pending.values():
+            fut.set_exception(error)
+
+    def encode(self, texts, normalize: bool = False) -> np.ndarray:
+        """Same contract as SentenceTransformer.encode(..., convert_to_numpy=True)."""
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        fut = Future()
+        with self._lock:
+            if self._dead is not None or not self._process.is_alive():
+                raise RuntimeError("Embedding worker process exited.")
+            req_id = next(self._ids)
+            self._pending[req_id] = fut
+        self._requests.put((req_id, batch))
+        try:
+            vectors = fut.result(timeout=EMBED_TIMEOUT)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            raise
+
+        if normalize:
+            vectors = vectors / np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+    def close(self):
+        self._requests.put(None)
+        self._process.join(timeout=5)
+
+
+class WorkerEmbeddings(Embeddings):
+    """LangChain embeddings backed by an EmbeddingWorker (drop-in for HuggingFaceEmbeddings)."""
+
+    def __init__(self, worker: EmbeddingWorker):
+        self.worker = worker
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.worker.encode(texts).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.worker.encode(text).tolist()
+
@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import threading
+from collections import deque
+
+# =============================
+# Config
+# =============================
+RELOAD_INTERVAL = float(os.environ.get("MEDIBOT_RELOAD_INTERVAL", "30"))  # seconds, 0 disables
+KEEP_VERSIONS = int(os.environ.get("MEDIBOT_KEEP_VERSIONS", "1"))        # old versions kept (in memory) for rollback
+
+
+class HotResource:
+    """A file-backed resource that can be reloaded without restarting the process.
+
+    The current version is swapped by a single reference assignment, so a request that
+    already called get() keeps using the version it got. Previous versions stay in
+    memory for rollback().
+    """
+
+    def __init__(self, name: str, paths: list[str], loader, optional: bool = False, keep: int = KEEP_VERSIONS,
+                 optional_paths: list[str] = ()):
+        self.name = name
+        self.paths = paths
+        self.optional_paths = list(optional_paths)  # also watched, may be absent (e.g. a compiled snapshot)
+        self.loader = loader
+        self.optional = optional  # missing/broken at startup -> None instead of raising
+        self._lock = threading.Lock()
+        self._current = None      # (signature, value)
+        self._history = deque(maxlen=keep)
+        self._pending = None      # signature seen once, waiting to settle
+        self._skip = None         # file signature not to (re)load: rolled back from, or broken
+
+    def signature(self) -> tuple:
+        sig = []
+        for p in self.paths + self.optional_paths:
+            try:
+                st = os.stat(p)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                sig.append(None)
+        return tuple(sig)
+
+    def get(self):
+        current = self._current
+        if current is None:
+            with self._lock:
+                if self._current is None:
+                    sig = self.signature()
+                    try:
+                        value = self.loader()
+                    except Exception as e:
+                        if not self.optional:
+                            raise
+                        print(f"Warning: Could not load {self.name}. Error: {e}")
+                        value = None
+                    self._current = (sig, value)
+                current = self._current
+        return current[1]
+
+    def reload_if_changed(self) -> bool:
+        """Load a changed version and swap it in. Runs off the request path (watcher)."""
+        if self._current is None:
+            return False  # never loaded; the first get() will read the latest files
+        sig = self.signature()
+        if sig == self._current[0] or sig == self._skip:
+            self._pending = None
+            return False
+        if sig != self._pending:
+            self._pending = sig  # wait one more poll so half-written files aren't loaded
+            return False
+        if any(s is None for s in sig[:len(self.paths)]):
+            return False
+
+        try:
+            value = self.loader()
+        except Exception as e:
+            print(f"Warning: Could not reload {self.name}; keeping current version. Error: {e}")
+            self._skip = sig
+            return False
+
+        with self._lock:
+            self._history.append(self._current)
+            self._current = (sig, value)
+            self._pending = self._skip = None
+        print(f"🔄 Reloaded {self.name}")
+        return True
+
+    def rollback(self) -> bool:
+        """Swap back to the previous version (until the files change again)."""
+        with self._lock:
+            if not self._history:
+                return False
+            self._skip = self.signature()
+            self._current = self._history.pop()
+        print(f"↩️ Rolled back {self.name}")
+        return True
+
+
+class ResourceWatcher:
+    """Polls HotResources for new versions, either in a thread or as an asyncio task."""
+
+    def __init__(self, resources: list[HotResource], interval: float = RELOAD_INTERVAL):
+        self.resources = resources
+        self.interval = interval
+        self._thread = None
+
+    def poll_once(self):
+        for r in self.resources:
+            r.reload_if_changed()
+
+    def _run(self):
+        while True:
+            self.poll_once()
+            time.sleep(self.interval)
+
+    def start(self):
+        """Start a daemon polling thread (no-op if already started or disabled)."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="resource-watcher", daemon=True)
+            self._thread.start()
+
+    async def run_async(self):
+        """Polling loop for an asyncio app; loading happens in a worker thread."""
+        while self.interval > 0:
+            await asyncio.to_thread(self.poll_once)
+            await asyncio.sleep(self.interval)
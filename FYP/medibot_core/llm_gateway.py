@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import heapq
+import random
+import itertools
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import Future
+
+from google.api_core import exceptions as google_exceptions
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_google_genai import ChatGoogleGenerativeAI
+
+# =============================
+# Config
+# =============================
+LLM_RPM = float(os.environ.get("MEDIBOT_LLM_RPM", "15"))              # requests per minute (quota)
+LLM_BURST = float(os.environ.get("MEDIBOT_LLM_BURST", "5"))           # token bucket capacity
+LLM_MAX_RETRIES = int(os.environ.get("MEDIBOT_LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = 1.0   # seconds
+LLM_BACKOFF_MAX = 30.0   # seconds
+
+PRIORITIES = {"interactive": 0, "batch": 1}  # lower is served first
+
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,  # 429 over gRPC
+    google_exceptions.TooManyRequests,    # 429 over REST
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+)
+
+_priority = ContextVar("medibot_llm_priority", default="interactive")
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls at `priority` ("interactive" or "batch")."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class LLMGateway:
+    """Shared admission control for upstream LLM calls.
+
+    - token bucket sized to the quota (rpm, burst); waiting callers are served by
+      priority, then arrival order
+    - retryable errors (429/5xx) back off with full jitter and drain the bucket so
+      other callers slow down too
+    - identical in-flight calls (same key) share one upstream call
+    """
+
+    def __init__(self, rpm: float = LLM_RPM, burst: float = LLM_BURST, max_retries: int = LLM_MAX_RETRIES,
+                 backoff_base: float = LLM_BACKOFF_BASE, backoff_max: float = LLM_BACKOFF_MAX):
+        self.rate = rpm / 60.0
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._cond = threading.Condition()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._waiting = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+
+        self._inflight_lock = threading.Lock()
+        self._inflight = {}  # key -> Future
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _acquire(self, priority: str):
+        ticket = (PRIORITIES.get(priority, 0), next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            while True:
+                self._refill()
+                if self._waiting[0] == ticket and self._tokens >= 1:
+                    heapq.heappop(self._waiting)
+                    self._tokens -= 1
+                    self._cond.notify_all()
+                    return
+                timeout = (1 - self._tokens) / self.rate if self._waiting[0] == ticket else None
+                self._cond.wait(timeout=timeout)
+
+    def _penalize(self):
+        with self._cond:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0)
+
+    def _call_with_retries(self, fn, priority: str):
+        for attempt in range(self.max_retries + 1):
+            self._acquire(priority)
+            try:
+                return fn()
+            except RETRYABLE_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                self._penalize()
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt)))
+
+    def call(self, key: str, fn, priority: str | None = None):
+        """fn() through the limiter; concurrent calls with the same key share the result."""
+        with self._inflight_lock:
+            fut = self._inflight.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._inflight[key] = Future()
+        if not leader:
+            return fut.result()
+
+        try:
+            result = self._call_with_retries(fn, priority or _priority.get())
+            fut.set_result(result)
+            return result
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+
+def _request_key(messages, stop, kwargs) -> str:
+    payload = [
+        [m.type, m.content, getattr(m, "tool_calls", None), getattr(m, "tool_call_id", None)] for m in messages
+    ]
+    return json.dumps([payload, stop, kwargs], sort_keys=True, default=repr)
+
+
+class RateLimitedChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """ChatGoogleGenerativeAI whose requests all go through an LLMGateway."""
+
+    # Every path (invoke, stream, async) ends in _generate, so nothing bypasses the gateway.
+    _stream = BaseChatModel._stream
+    _astream = BaseChatModel._astream
+    _agenerate = BaseChatModel._agenerate
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        from .resources import get_llm_gateway
+
+        generate = super()._generate
+        return get_llm_gateway().call(
+            _request_key(messages, stop, kwargs),
+            lambda: generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+        )
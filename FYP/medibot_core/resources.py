@@ -0,0 +1,187 @@
+import os
+import re
+import threading
+import functools
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.retrievers import BaseRetriever
+from langchain_google_genai import GoogleGenerativeAIEmbeddings
+
+try:
+    from langchain.agents import create_tool_calling_agent, AgentExecutor
+    from langchain.chains import create_retrieval_chain
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+except ImportError:  # langchain>=1.0 moved these to langchain-classic
+    from langchain_classic.agents import create_tool_calling_agent, AgentExecutor
+    from langchain_classic.chains import create_retrieval_chain
+    from langchain_classic.chains.combine_documents import create_stuff_documents_chain
+
+from .config import (
+    GOOGLE_API_KEY, AGENT_MODEL, LLM_ENDPOINT, SAFETY_SETTINGS, EMBEDDING_BACKEND, GOOGLE_EMBEDDING_MODEL,
+    LOCAL_EMBEDDING_MODEL, VECTORSTORE_PATH, DOCTORS_CSV, DISEASES_TXT, DOCTORS_SNAPSHOT, DOCSTORE_SNAPSHOT, RETRIEVER_K, QA_PROMPT_TEMPLATE,
+)
+from .docstore import load_faiss_from_snapshot
+from .doctors import DoctorDirectory
+from .embeddings import EmbeddingWorker, WorkerEmbeddings
+from .hot_reload import HotResource, ResourceWatcher
+from .llm_gateway import LLMGateway, RateLimitedChatGoogleGenerativeAI
+from .snapshot import open_snapshot
+from .specialty_classifier import SpecialtyClassifier, load_or_train
+
+
+# =============================
+# Singleton providers (one instance per process, built on first use)
+# =============================
+def _singleton(fn):
+    lock = threading.Lock()
+    instance = []
+
+    @functools.wraps(fn)
+    def wrapper():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(fn())
+        return instance[0]
+
+    return wrapper
+
+
+@_singleton
+def get_embedding_worker() -> EmbeddingWorker:
+    return EmbeddingWorker(LOCAL_EMBEDDING_MODEL)
+
+
+@_singleton
+def get_embeddings():
+    if EMBEDDING_BACKEND == "local":
+        return WorkerEmbeddings(get_embedding_worker())
+    return GoogleGenerativeAIEmbeddings(model=GOOGLE_EMBEDDING_MODEL)
+
+
+def embed_queries(texts: list[str]) -> list[list[float]]:
+    """Embed many retrieval queries with one embedding call."""
+    if EMBEDDING_BACKEND == "local":
+        return get_embeddings().embed_documents(texts)
+    return get_embeddings().embed_documents(texts, task_type="retrieval_query")
+
+
+def _load_vectorstore():
+    # Prefer the mmap'd docstore snapshot over unpickling index.pkl (see snapshot.py)
+    snapshot = open_snapshot(DOCSTORE_SNAPSHOT, "docstore", os.path.join(VECTORSTORE_PATH, "index.pkl"))
+    if snapshot is not None:
+        try:
+            return load_faiss_from_snapshot(os.path.join(VECTORSTORE_PATH, "index.faiss"), snapshot, get_embeddings())
+        except ValueError as e:
+            print(f"⚠️ Ignoring docstore snapshot: {e}")
+    return FAISS.load_local(VECTORSTORE_PATH, get_embeddings(), allow_dangerous_deserialization=True)
+
+
+def _load_doctor_directory() -> DoctorDirectory:
+    snapshot = open_snapshot(DOCTORS_SNAPSHOT, "doctors", DOCTORS_CSV)
+    return DoctorDirectory.from_snapshot(snapshot) if snapshot else DoctorDirectory.from_csv(DOCTORS_CSV)
+
+
+# Reloaded in place by the watcher when the files change (see hot_reload.py)
+_vectorstore = HotResource(
+    "vectorstore",
+    [os.path.join(VECTORSTORE_PATH, "index.faiss"), os.path.join(VECTORSTORE_PATH, "index.pkl")],
+    _load_vectorstore,
+    optional=True,
+    optional_paths=[DOCSTORE_SNAPSHOT],
+)
+_doctor_directory = HotResource(
+    "doctor directory", [DOCTORS_CSV], _load_doctor_directory, optional_paths=[DOCTORS_SNAPSHOT]
+)
+
+
+def get_vectorstore():
+    """Current vectorstore version (None if it isn't built)."""
+    return _vectorstore.get()
+
+
+def get_doctor_directory() -> DoctorDirectory:
+    return _doctor_directory.get()
+
+
+@_singleton
+def get_watcher() -> ResourceWatcher:
+    return ResourceWatcher([_vectorstore, _doctor_directory])
+
+
+def rollback(resource: str) -> bool:
+    """Swap "vectorstore" or "doctors" back to its previous loaded version."""
+    return {"vectorstore": _vectorstore, "doctors": _doctor_directory}[resource].rollback()
+
+
+class _CurrentRetriever(BaseRetriever):
+    """Retriever over whichever vectorstore version is current when the query runs."""
+
+    k: int = RETRIEVER_K
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        vectorstore = get_vectorstore()
+        return vectorstore.similarity_search(query, k=self.k) if vectorstore else []
+
+
+@_singleton
+def get_retriever() -> BaseRetriever:
+    return _CurrentRetriever()
+
+
+@_singleton
+def get_llm_gateway() -> LLMGateway:
+    """Rate limiter / retry / coalescing shared by every Gemini chat call in the process."""
+    return LLMGateway()
+
+
+@_singleton
+def get_llm() -> RateLimitedChatGoogleGenerativeAI:
+    endpoint = {"client_options": {"api_endpoint": LLM_ENDPOINT}, "transport": "rest"} if LLM_ENDPOINT else {}
+    return RateLimitedChatGoogleGenerativeAI(
+        model=AGENT_MODEL,
+        google_api_key=GOOGLE_API_KEY,
+        safety_settings=SAFETY_SETTINGS,
+        max_retries=1,  # retries are the gateway's job
+        **endpoint,
+    )
+
+
+@_singleton
+def get_qa_chain():
+    """Retrieval QA chain over the encyclopedia (always uses the current vectorstore)."""
+    combine_docs_chain = create_stuff_documents_chain(get_llm(), ChatPromptTemplate.from_template(QA_PROMPT_TEMPLATE))
+    return create_retrieval_chain(get_retriever(), combine_docs_chain)
+
+
+@_singleton
+def get_classifier() -> SpecialtyClassifier:
+    return load_or_train()
+
+
+@_singleton
+def get_disease_names() -> list[str]:
+    with open(DISEASES_TXT, mode="r", encoding="utf-8") as f:
+        return [m.group(1).strip().title() for m in re.finditer(r"^DISEASE:(.+)$", f.read(), re.MULTILINE)]
+
+
+def infer_specialty(text: str) -> str | None:
+    if not text:
+        return None
+    return get_classifier().infer_specialty(text)
+
+
+# =============================
+# Agent
+# =============================
+def create_agent_executor(system_prompt: str, tools: list, verbose: bool = True) -> AgentExecutor:
+    """Tool-calling agent over the shared LLM. Prompt and tools are front-end specific."""
+    agent_prompt = ChatPromptTemplate.from_messages([
+        ("system", system_prompt),
+        MessagesPlaceholder(variable_name="chat_history"),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ])
+    agent = create_tool_calling_agent(get_llm(), tools, agent_prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=verbose)
@@ -0,0 +1,194 @@
+import os
+import json
+import mmap
+import time
+import struct
+
+import numpy as np
+
+# =============================
+# Snapshot format
+# =============================
+# [magic][u32 version][u32 header length][JSON header][column data...]
+#
+# The header lists each column's dtype, offset and length. Columns are 8-byte aligned and
+# used in place from an mmap, so opening a snapshot does no per-row work and its pages are
+# shared between processes. A string column is uint64 offsets into one shared UTF-8 blob.
+#
+# A snapshot path (e.g. doctors.snap) is a small pointer file naming the current data file
+# (doctors.snap.<version>). Rebuilding writes a new data file and swaps the pointer, so a
+# data file that a running process has mapped is never overwritten or renamed over
+# (Windows refuses both while the mapping is open).
+MAGIC = b"MEDISNAP"
+POINTER_MAGIC = b"MEDISNAP->"
+FORMAT_VERSION = 1
+_ALIGN = 8
+
+
+def _aligned(n: int) -> int:
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def source_signature(path: str) -> list[int]:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def snapshot_file(path: str) -> str:
+    """The data file the snapshot pointer at `path` currently names."""
+    with open(path, "rb") as f:
+        pointer = f.read(1024)
+    if not pointer.startswith(POINTER_MAGIC):
+        raise ValueError(f"{path} is not a snapshot pointer")
+    return os.path.join(os.path.dirname(path), pointer[len(POINTER_MAGIC):].decode("utf-8"))
+
+
+def _remove_old_versions(path: str, keep: str):
+    directory, prefix = os.path.split(path)
+    for name in os.listdir(directory or "."):
+        if name.startswith(prefix + ".") and name != keep and not name.endswith(".tmp"):
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # still mapped by a running process (Windows); removed by a later build
+
+
+def write_snapshot(path: str, kind: str, arrays: dict[str, np.ndarray], strings: dict[str, list[str]], source: str):
+    """Write a snapshot compiled from `source`.
+
+    The data goes to a new versioned file and then the pointer at `path` is swapped to it.
+    Processes that mapped an older version keep it until they drop it; its file is deleted
+    here when possible (on Windows only once no process has it mapped, by a later build).
+    """
+    columns = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    blob = bytearray()
+    for name, values in strings.items():
+        offsets = np.empty(len(values) + 1, dtype=np.uint64)
+        offsets[0] = len(blob)
+        for i, s in enumerate(values):
+            blob += s.encode("utf-8")
+            offsets[i + 1] = len(blob)
+        columns[name + ".offsets"] = offsets
+    columns["blob"] = np.frombuffer(bytes(blob), dtype=np.uint8)
+
+    layout, pos = {}, 0
+    for name, a in columns.items():
+        layout[name] = {"dtype": a.dtype.str, "offset": pos, "count": int(a.size)}
+        pos = _aligned(pos + a.nbytes)
+    header = json.dumps({
+        "kind": kind,
+        "source": source_signature(source),
+        "strings": list(strings),
+        "columns": layout,
+    }).encode("utf-8")
+
+    data_name = f"{os.path.basename(path)}.{time.time_ns():x}"
+    with open(os.path.join(os.path.dirname(path), data_name), "xb") as f:
+        prefix = MAGIC + struct.pack("<II", FORMAT_VERSION, len(header)) + header
+        f.write(prefix + b"\0" * (_aligned(len(prefix)) - len(prefix)))
+        for a in columns.values():
+            f.write(a.tobytes())
+            f.write(b"\0" * (_aligned(a.nbytes) - a.nbytes))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(POINTER_MAGIC + data_name.encode("utf-8"))
+    os.replace(tmp_path, path)  # the pointer is read and closed, never mapped
+    _remove_old_versions(path, keep=data_name)
+
+
+class StringColumn:
+    """Read-only sequence of strings stored as offsets into a UTF-8 blob (decoded on access)."""
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = range(len(self))[i]
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class Snapshot:
+    """A memory-mapped snapshot. snapshot[name] is a NumPy array or a StringColumn.
+
+    The mapping stays open while the snapshot or any column taken from it is referenced
+    (e.g. by an old version kept for rollback) and is closed when they are collected.
+    """
+
+    def __init__(self, path: str):
+        path = snapshot_file(path)
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a snapshot")
+        version, header_len = struct.unpack_from("<II", self._mm, len(MAGIC))
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format v{version}, expected v{FORMAT_VERSION}")
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + header_len])
+        self.kind = self.header["kind"]
+
+        data_start = _aligned(start + header_len)
+        self._columns = {
+            name: np.frombuffer(self._mm, dtype=c["dtype"], count=c["count"], offset=data_start + c["offset"])
+            for name, c in self.header["columns"].items()
+        }
+
+    def __getitem__(self, name: str):
+        if name in self.header["strings"]:
+            return StringColumn(self._columns[name + ".offsets"], self._columns["blob"])
+        return self._columns[name]
+
+    def is_current_for(self, source: str) -> bool:
+        """True if `source` is unchanged since the snapshot was compiled from it."""
+        return self.header["source"] == source_signature(source)
+
+
+def open_snapshot(path: str, kind: str, source: str) -> Snapshot | None:
+    """The snapshot at `path` if it exists and is current for `source`, else None (use the source)."""
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = Snapshot(path)
+        if snapshot.kind != kind:
+            raise ValueError(f"{path} is a {snapshot.kind} snapshot, expected {kind}")
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring snapshot: {e}")
+        return None
+    if not snapshot.is_current_for(source):
+        print(f"⚠️ {os.path.basename(path)} is out of date with {os.path.basename(source)}; "
+              f"loading the source (rebuild with: python -m medibot_core.snapshot)")
+        return None
+    return snapshot
+
+
+# =============================
+# Build step
+# =============================
+def main():
+    from .config import DOCTORS_CSV, DOCTORS_SNAPSHOT, VECTORSTORE_PATH, DOCSTORE_SNAPSHOT
+    from .doctors import build_doctors_snapshot
+    from .docstore import build_docstore_snapshot
+
+    build_doctors_snapshot(DOCTORS_CSV, DOCTORS_SNAPSHOT)
+    print(f"✅ Doctor directory snapshot: {DOCTORS_SNAPSHOT}")
+
+    index_pkl = os.path.join(VECTORSTORE_PATH, "index.pkl")
+    if os.path.exists(index_pkl):
+        build_docstore_snapshot(index_pkl, DOCSTORE_SNAPSHOT)
+        print(f"✅ Encyclopedia docstore snapshot: {DOCSTORE_SNAPSHOT}")
+    else:
+        print("⚠️ No vectorstore found; run create_memory_for_llm.py first to snapshot the encyclopedia.")
+
+
+if __name__ == "__main__":
+    main()
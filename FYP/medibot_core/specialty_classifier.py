@@ -0,0 +1,262 @@
+import os
+import re
+import math
+import zlib
+import numpy as np
+
+from .config import DISEASES_TXT, DOCTORS_CSV, CLASSIFIER_PATH
+from .doctors import _read_doctors_csv
+
+# =============================
+# Config
+# =============================
+N_FEATURES = 2 ** 24   # hashed feature space (only ids seen in training are stored)
+L2_REG = 1e-3
+EPOCHS = 400
+LEARNING_RATE = 2.0
+CV_FOLDS = 5
+MIN_SCORE = 0.5        # below this, infer_specialty returns None
+OTHER = "Other"        # prefix of background labels: encyclopedia sections no directory specialty covers
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "the", "i", "im", "my", "me", "we", "you", "your", "it", "is", "are", "am", "be",
+    "been", "have", "has", "had", "and", "or", "of", "to", "in", "on", "at", "for", "with", "from",
+    "by", "when", "what", "who", "how", "do", "does", "this", "that", "some", "very", "can", "please",
+    "need", "feel", "feeling", "got", "get", "about", "hurt", "hurts", "hurting", "lot", "time", "all",
+    "after", "always", "often", "well", "there", "t", "s", "cant", "can't", "keep", "really", "since",
+    "days", "doctor", "specialist", "problem", "problems", "issue", "issues", "left", "right",
+}
+_SECTION_RE = re.compile(r"^===\s*(.+?)\s*===$")
+_COVERS_RE = re.compile(r"^\(Covers:\s*(.+)\)$")
+
+
+# =============================
+# Features (hashed word unigrams, 5-char stems and bigrams)
+# =============================
+def _features(text: str) -> dict[int, int]:
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+    feats = [f"w:{t}" for t in tokens]
+    feats += [f"s:{t[:5]}" for t in tokens if len(t) >= 5]
+    feats += [f"b:{a}_{b}" for a, b in zip(tokens, tokens[1:])]
+
+    counts = {}
+    for f in feats:
+        idx = zlib.crc32(f.encode("utf-8")) % N_FEATURES
+        counts[idx] = counts.get(idx, 0) + 1
+    return counts
+
+
+def _vectorize(counts: dict[int, int], features: np.ndarray, idf: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sparse sublinear TF-IDF vector over the known `features` (rows, L2-normalized values).
+
+    Hash ids not in the sorted `features` array are dropped, but still count towards the
+    norm (as the rarest known feature would): a query that is mostly unknown words scores
+    low instead of being decided by its one known word ("knee pain" vs "pain").
+    """
+    ids = np.fromiter(counts, dtype=np.int64, count=len(counts))
+    tf = np.fromiter((1.0 + math.log(c) for c in counts.values()), dtype=np.float32, count=len(counts))
+    rows = np.minimum(np.searchsorted(features, ids), len(features) - 1)
+    known = features[rows] == ids
+    rows, vals = rows[known], tf[known] * idf[rows[known]]
+    unknown = tf[~known] * float(idf.max())
+    norm = float(np.sqrt(vals @ vals + unknown @ unknown))
+    return rows, (vals / norm if norm else vals)
+
+
+# =============================
+# Training data from the encyclopedia
+# =============================
+def directory_specialties(path: str = DOCTORS_CSV) -> list[str]:
+    return sorted({r["specialty"] for r in _read_doctors_csv(path) if r.get("specialty")})
+
+
+def load_training_data(
+    path: str = DISEASES_TXT, specialties: list[str] | None = None
+) -> tuple[list[str], list[tuple[str, int, str]]]:
+    """Parse diseases.txt into (labels, examples).
+
+    Each `=== SECTION ===` is labelled with the first directory specialty in its "Covers:"
+    line, so the classifier never suggests a specialty nobody can be booked for. Sections
+    with none (eye care, GENERAL MEDICINE, ...) each get a background label "Other: <section>"
+    that takes probability mass but is never suggested; one per section keeps them from being
+    outweighed, so everyday symptoms like fever or nausea don't point at a specialist.
+    Examples are (text, label, group) from the section title, the Covers list, disease names
+    and SYMPTOMS lines (whole line and each phrase). Examples from the same disease share a
+    group (used to spread them across CV folds).
+    """
+    if specialties is None:
+        specialties = directory_specialties()
+    labels = list(specialties)
+    label_of = {name: i for i, name in enumerate(labels)}
+
+    examples = []
+    section = None
+    disease = None
+
+    with open(path, mode="r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line:
+                continue
+
+            m = _SECTION_RE.match(line)
+            if m:
+                section = m.group(1)
+                section_parts = [p.strip() for p in re.split(r"[,&]", section) if p.strip()]
+                disease = None
+                continue
+            if section is None:
+                continue
+
+            m = _COVERS_RE.match(line)
+            if m:
+                covers = [c.strip() for c in m.group(1).split(",") if c.strip() and c.strip() != "etc."]
+                section_label = next((label_of[c] for c in covers if c in label_of), None)
+                if section_label is None:
+                    section_label = len(labels)
+                    labels.append(f"{OTHER}: {section.title()}")
+                group = f"header:{section}"
+                examples += [(p, section_label, group) for p in section_parts]
+                examples += [(c, section_label, group) for c in covers]
+            elif line.startswith("DISEASE:"):
+                disease = line[len("DISEASE:"):].strip()
+                examples.append((disease, section_label, disease))
+            elif line.startswith("SYMPTOMS:") and disease:
+                symptoms = line[len("SYMPTOMS:"):].strip()
+                examples.append((symptoms, section_label, disease))
+                examples += [(p.strip(), section_label, disease) for p in re.split(r"[,;]", symptoms) if p.strip()]
+
+    return labels, examples
+
+
+def _fit(X: np.ndarray, y: np.ndarray, n_classes: int) -> tuple[np.ndarray, np.ndarray]:
+    """Class-balanced softmax regression by full-batch gradient descent."""
+    n = X.shape[0]
+    Y = np.eye(n_classes, dtype=np.float32)[y]
+    weights = (1.0 / np.maximum(np.bincount(y, minlength=n_classes), 1))[y].astype(np.float32)
+    weights *= n / weights.sum()
+
+    W = np.zeros((X.shape[1], n_classes), dtype=np.float32)
+    b = np.zeros(n_classes, dtype=np.float32)
+    for _ in range(EPOCHS):
+        P = _softmax(X @ W + b)
+        G = (P - Y) * weights[:, None] / n
+        W -= LEARNING_RATE * (X.T @ G + L2_REG * W)
+        b -= LEARNING_RATE * G.sum(axis=0)
+    return W, b
+
+
+def _fit_temperature(logits: np.ndarray, y: np.ndarray) -> float:
+    """Temperature minimizing NLL of held-out logits."""
+    best_t, best_nll = 1.0, float("inf")
+    for t in np.geomspace(0.05, 20.0, 200):
+        P = _softmax(logits / t)
+        nll = -float(np.mean(np.log(P[np.arange(len(y)), y] + 1e-12)))
+        if nll < best_nll:
+            best_t, best_nll = float(t), nll
+    return best_t
+
+
+def _softmax(z: np.ndarray) -> np.ndarray:
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def train(path: str = DISEASES_TXT, specialties: list[str] | None = None) -> "SpecialtyClassifier":
+    labels, examples = load_training_data(path, specialties)
+    n_classes = len(labels)
+    y = np.array([c for _, c, _ in examples], dtype=np.int64)
+    counts = [_features(text) for text, _, _ in examples]
+
+    df = {}
+    for c in counts:
+        for f in c:
+            df[f] = df.get(f, 0) + 1
+    features = np.array(sorted(df), dtype=np.int64)
+    idf = np.array([math.log((1 + len(counts)) / (1 + df[f])) + 1 for f in features], dtype=np.float32)
+
+    X = np.zeros((len(counts), len(features)), dtype=np.float32)
+    for i, c in enumerate(counts):
+        rows, vals = _vectorize(c, features, idf)
+        X[i, rows] = vals
+
+    # Out-of-fold logits for temperature calibration. Headers always stay in training; whole
+    # diseases are held out, since what patients type is mostly not in the encyclopedia.
+    fold = np.array(
+        [-1 if g.startswith("header:") else zlib.crc32(g.encode("utf-8")) % CV_FOLDS for _, _, g in examples]
+    )
+    oof = np.zeros((len(examples), n_classes), dtype=np.float32)
+    for k in range(CV_FOLDS):
+        test = fold == k
+        W, b = _fit(X[~test], y[~test], n_classes)
+        oof[test] = X[test] @ W + b
+    held_out = fold >= 0
+    temperature = _fit_temperature(oof[held_out], y[held_out])
+
+    W, b = _fit(X, y, n_classes)
+    return SpecialtyClassifier(features, idf, W, b, temperature, labels)
+
+
+# =============================
+# Inference
+# =============================
+class SpecialtyClassifier:
+    """Maps free text (symptoms, specialty names) to calibrated specialty scores."""
+
+    def __init__(self, features, idf, W, b, temperature, specialties):
+        self.features = np.asarray(features, dtype=np.int64)  # sorted hash ids seen in training
+        self.idf = np.asarray(idf, dtype=np.float32)
+        self.W = np.ascontiguousarray(W, dtype=np.float32)     # (len(features), n_classes)
+        self.b = np.asarray(b, dtype=np.float32)
+        self.temperature = float(temperature)
+        self.specialties = [str(s) for s in specialties]
+
+    def predict(self, text: str, k: int = 3) -> list[tuple[str, float]]:
+        """Top-k (specialty, probability) pairs, best first. Empty if no known terms.
+
+        Background ("Other: ...") labels take probability mass but are never listed.
+        """
+        counts = _features(text or "")
+        if not counts:
+            return []
+        rows, vals = _vectorize(counts, self.features, self.idf)
+        if not len(rows):
+            return []
+        probs = _softmax((vals @ self.W[rows] + self.b) / self.temperature)
+        top = [i for i in np.argsort(-probs) if not self.specialties[i].startswith(OTHER)][:k]
+        return [(self.specialties[i], float(probs[i])) for i in top]
+
+    def infer_specialty(self, text: str, min_score: float = MIN_SCORE) -> str | None:
+        top = self.predict(text, k=1)
+        if top and top[0][1] >= min_score:
+            return top[0][0]
+        return None
+
+    def save(self, path: str = CLASSIFIER_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(
+            path, features=self.features, idf=self.idf, W=self.W, b=self.b,
+            temperature=np.float32(self.temperature), specialties=np.array(self.specialties),
+        )
+
+    @classmethod
+    def load(cls, path: str = CLASSIFIER_PATH) -> "SpecialtyClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["features"], data["idf"], data["W"], data["b"], data["temperature"], data["specialties"])
+
+
+def load_or_train(path: str = CLASSIFIER_PATH) -> SpecialtyClassifier:
+    """Load the trained classifier (trains in-process if the model file is missing)."""
+    try:
+        return SpecialtyClassifier.load(path)
+    except FileNotFoundError:
+        print(f"Warning: {path} not found; training specialty classifier in memory.")
+        return train()
+
+
+if __name__ == "__main__":
+    clf = train()
+    clf.save()
+    print(f"✅ Saved {len(clf.specialties)}-class specialty classifier to {CLASSIFIER_PATH} (T={clf.temperature:.2f})")
@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from concurrent.futures import ThreadPoolExecutor
+
+# =============================
+# Speculative tool execution
+# =============================
+# While the agent's planning call is in flight, likely tool work (retrieval, directory lookup)
+# runs here. Tools pick up a matching precomputed result; anything unclaimed is discarded.
+SPECULATION_WORKERS = 4
+
+_pool = ThreadPoolExecutor(max_workers=SPECULATION_WORKERS, thread_name_prefix="speculate")
+_speculations = ContextVar("medibot_speculations", default=None)
+
+
+@contextmanager
+def speculate(calls: list[tuple]):
+    """Start `calls` [(tool_name, key, fn, args), ...] in the background for the enclosed block."""
+    futures = {(name, key): _pool.submit(fn, *args) for name, key, fn, args in calls}
+    token = _speculations.set(futures)
+    try:
+        yield futures
+    finally:
+        _speculations.reset(token)
+        for fut in futures.values():
+            fut.cancel()  # not started yet -> never runs
+
+
+def speculative_result(name: str, key, fn, *args):
+    """Result of a matching speculative call if one is running or done, else fn(*args)."""
+    fut = (_speculations.get() or {}).get((name, key))
+    if fut is None or fut.cancel():
+        return fn(*args)  # nothing speculated, or still queued behind other work: do it here
+    try:
+        return fut.result()
+    except Exception:
+        return fn(*args)  # fall back to running it for real
@@ -0,0 +1,140 @@
+import re
+from langchain_core.tools import tool
+
+from .doctors import priority_label
+from .resources import (
+    get_doctor_directory, get_vectorstore, get_embeddings, embed_queries, get_disease_names, infer_specialty,
+)
+from .speculation import speculative_result
+
+
+# =============================
+# Tool implementations
+# =============================
+def _doctor_recommendations(specialty: str, city_in: str) -> dict:
+    directory = get_doctor_directory()
+    results = directory.find(specialty, city_in, limit=3)
+    if not results:
+        alt_cities = [c for c in directory.cities_for(specialty) if c.lower() != city_in]
+        alt_msg = f" Try nearby cities: {', '.join(alt_cities[:3])}." if alt_cities else ""
+        return {"error": f"No {specialty} found in {city_in.title()}.{alt_msg}"}
+
+    rec_text = f"Found matches in {city_in.title()}:\n"
+    for r in results:
+        phone = r.get('phone', 'N/A')
+        rec_text += f"- {r['name']} ({r['specialty']}, {priority_label(r['priority'])}) - {r['address']} - 📞 {phone}\n"
+
+    # Return clean specialty for button logic
+    return {"recommendations": rec_text, "specialty_found": results[0]["specialty"]}
+
+
+def _disease_info(query: str, vector: list[float] | None = None) -> str:
+    vectorstore = get_vectorstore()
+    if not vectorstore: return "Knowledge base not loaded."
+    if vector is None:  # not embedded ahead of time (see embed_disease_queries)
+        vector = get_embeddings().embed_query(query)
+    docs = vectorstore.similarity_search_by_vector(vector, k=1)
+    if not docs: return "I checked the encyclopedia but found no information."
+    return f"**From Encyclopedia:**\n{docs[0].page_content}"
+
+
+def _disease_key(query: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", query.lower()).strip()
+
+
+# Specific disease-question forms; the catch-all "about X" also matches small talk
+# ("I'm worried about my heart"), so speculation only trusts these.
+_DISEASE_QUESTION_PATTERNS = [
+    r"(?:tell|can you tell) (?:me )?about (?:the )?([a-zA-Z0-9\s]+)",
+    r"what is ([a-zA-Z0-9\s]+)",
+    r"information on ([a-zA-Z0-9\s]+)",
+]
+_DISEASE_FALLBACK_PATTERN = r"about ([a-zA-Z0-9\s]+)"
+
+
+def extract_disease_name(query: str, specific_only: bool = False) -> str:
+    """Extract disease name from queries like 'tell about the X' or 'what is X'."""
+    patterns = _DISEASE_QUESTION_PATTERNS if specific_only else _DISEASE_QUESTION_PATTERNS + [_DISEASE_FALLBACK_PATTERN]
+    for pattern in patterns:
+        match = re.search(pattern, query.lower())
+        if match:
+            disease = match.group(1).strip()
+            if len(disease.split()) <= 4:  # Limit to reasonable length
+                return disease
+    return None
+
+
+def embed_disease_queries(messages: list[str]) -> dict:
+    """Query vectors for the disease questions in `messages`, from one embedding call.
+
+    Keyed like the disease_info tool; pass to likely_tool_calls(query_vectors=...).
+    """
+    diseases = {}
+    for message in messages:
+        disease = extract_disease_name(message, specific_only=True)
+        if disease:
+            diseases.setdefault(_disease_key(disease), disease)
+    if not diseases or get_vectorstore() is None:
+        return {}
+    return dict(zip(diseases, embed_queries(list(diseases.values()))))
+
+
+def likely_tool_calls(message: str, query_vectors: dict | None = None) -> list[tuple]:
+    """Tool calls the agent will probably make for `message`, for speculate().
+
+    Only strong local signals count: a disease question pattern, or a known city
+    together with a confidently inferred specialty.
+    """
+    calls = []
+    disease = extract_disease_name(message, specific_only=True)
+    if disease:
+        key = _disease_key(disease)
+        calls.append(("disease_info", key, _disease_info, (disease, (query_vectors or {}).get(key))))
+
+    directory = get_doctor_directory()
+    city_in = directory.city_in_text(message)
+    if city_in:
+        specialty = infer_specialty(message)
+        if specialty:
+            calls.append(("doctor_lookup", (specialty, city_in), _doctor_recommendations, (specialty, city_in)))
+    return calls
+
+
+# =============================
+# Tools
+# =============================
+
+
+@tool
+def doctor_lookup(user_specialty: str, city: str) -> dict:
+    """Find a doctor by specialty and city from the database. Handles spelling errors. Higher-priority doctors are listed first."""
+    if not user_specialty or not city:
+        return {"error": "Please provide both specialty and city."}
+
+    try:
+        directory = get_doctor_directory()
+        # Exact/partial specialty name first ("cardio"), then symptoms or lay terms ("heart doctor")
+        specialty = directory.match_specialty(user_specialty) or infer_specialty(user_specialty)
+        if not specialty:
+            return {"error": f"Sorry, I could not understand the specialty from '{user_specialty}'. Try being more specific, e.g., 'heart doctor'."}
+
+        city_in = directory.resolve_city(city)
+        return speculative_result("doctor_lookup", (specialty, city_in), _doctor_recommendations, specialty, city_in)
+
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@tool
+def disease_info(query: str) -> str:
+    """Find disease info from the encyclopedia."""
+    return speculative_result("disease_info", _disease_key(query), _disease_info, query)
+
+
+@tool
+def list_diseases() -> str:
+    """Returns a list of diseases found in the uploaded Encyclopedia."""
+    return "Diseases in my knowledge base: " + ", ".join(get_disease_names())
+
+
+TOOLS = [doctor_lookup, disease_info, list_diseases]
@@ -0,0 +1,147 @@
+import os
+import json
+import asyncio
+import threading
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # api.py builds its Gemini client at import (no calls made)
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api
+from medibot_core import tools
+
+
+@pytest.fixture
+def client():
+    return TestClient(api.app)  # not as a context manager: no startup event, no resource watcher
+
+
+def _lines(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+@pytest.fixture
+def fake_agent(monkeypatch):
+    calls = []
+    lock = threading.Lock()
+
+    def answer(message, query_vectors):
+        with lock:
+            calls.append((message, query_vectors))
+        return {"text": f"answer: {message}", "specialty": None}
+
+    monkeypatch.setattr(api, "_answer_stateless", answer)
+    monkeypatch.setattr(api, "embed_disease_queries", lambda messages: {"asthma": [0.5, 0.5]})
+    return calls
+
+
+# =============================
+# /doctors/batch
+# =============================
+def test_doctors_batch_matches_single_lookups_in_input_order(client):
+    queries = [
+        {"specialty": "Cardiologist", "city": "Lahore", "limit": 3},
+        {"specialty": "dentist", "city": "islamabd"},
+        {"specialty": "nosuch", "city": "Karachi"},
+        {"specialty": "Cardiologist", "city": "Lahore", "limit": 3},
+        {},
+    ]
+    lines = _lines(client.post("/doctors/batch", json={"queries": queries}))
+
+    assert [line["index"] for line in lines] == list(range(len(queries)))
+    for q, line in zip(queries, lines):
+        expected = client.get("/doctors", params=q).json()
+        assert line["doctors"] == expected["doctors"]
+        assert line["count"] == expected["count"]
+        assert (line["specialty"], line["city"]) == (q.get("specialty"), q.get("city"))
+
+
+def test_doctors_batch_size_limit(client, monkeypatch):
+    monkeypatch.setattr(api, "BATCH_MAX_ITEMS", 3)
+    assert client.post("/doctors/batch", json={"queries": [{}] * 3}).status_code == 200
+    assert client.post("/doctors/batch", json={"queries": [{}] * 4}).status_code == 413
+
+
+# =============================
+# /chat/batch
+# =============================
+def test_chat_batch_answers_each_message_once_in_input_order(client, fake_agent):
+    messages = ["what is asthma", "hi", "what is asthma", "chest pain, cardiologist in Lahore", "hi"]
+    lines = _lines(client.post("/chat/batch", json={"messages": messages}))
+
+    assert [line["index"] for line in lines] == list(range(len(messages)))
+    assert [line["text"] for line in lines] == [f"answer: {m}" for m in messages]
+    assert sorted(m for m, _ in fake_agent) == sorted(set(messages))
+    assert all(qv == {"asthma": [0.5, 0.5]} for _, qv in fake_agent)  # embedded up front, shared
+
+
+def test_chat_batch_size_limit(client, fake_agent, monkeypatch):
+    monkeypatch.setattr(api, "BATCH_MAX_ITEMS", 2)
+    assert client.post("/chat/batch", json={"messages": ["a", "b", "c"]}).status_code == 413
+    assert fake_agent == []
+
+
+def test_chat_batch_cancels_queued_messages_when_the_client_goes_away(monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def slow_answer(message, query_vectors):
+        started.append(message)
+        if message != "question 0":
+            release.wait(5)
+        return {"text": message, "specialty": None}
+
+    monkeypatch.setattr(api, "_answer_stateless", slow_answer)
+    monkeypatch.setattr(api, "embed_disease_queries", lambda messages: {})
+    messages = [f"question {i}" for i in range(api.CHAT_BATCH_CONCURRENCY * 5)]
+
+    async def read_first_line_then_disconnect():
+        response = await api.chat_batch_endpoint(api.ChatBatch(messages=messages))
+        assert json.loads(await response.body_iterator.__anext__())["text"] == "question 0"
+        await response.body_iterator.aclose()
+
+    asyncio.run(read_first_line_then_disconnect())
+    release.set()
+    api.chat_batch_pool.submit(lambda: None).result()  # let already-running calls finish
+    assert len(started) <= api.CHAT_BATCH_CONCURRENCY + 1  # the rest were never sent to the agent
+
+
+def test_chat_batch_survives_embedding_failure(client, fake_agent, monkeypatch):
+    def broken(messages):
+        raise RuntimeError("embedding API down")
+
+    monkeypatch.setattr(api, "embed_disease_queries", broken)
+    lines = _lines(client.post("/chat/batch", json={"messages": ["what is asthma"]}))
+    assert lines[0]["text"] == "answer: what is asthma"
+    assert fake_agent == [("what is asthma", {})]
+
+
+# =============================
+# Upfront query embedding
+# =============================
+def test_disease_questions_are_embedded_in_one_call(monkeypatch):
+    calls = []
+
+    def embed_queries(texts):
+        calls.append(list(texts))
+        return [[float(i)] for i in range(len(texts))]
+
+    monkeypatch.setattr(tools, "embed_queries", embed_queries)
+    monkeypatch.setattr(tools, "get_vectorstore", lambda: object())
+    vectors = tools.embed_disease_queries(["What is Asthma?", "what is asthma", "hello", "tell me about migraine"])
+
+    assert calls == [["asthma", "migraine"]]
+    assert vectors == {"asthma": [0.0], "migraine": [1.0]}
+    (name, key, fn, args), = tools.likely_tool_calls("what is asthma", vectors)
+    assert (name, key, fn, args) == ("disease_info", "asthma", tools._disease_info, ("asthma", [0.0]))
+
+
+def test_no_embedding_call_without_disease_questions_or_index(monkeypatch):
+    monkeypatch.setattr(tools, "embed_queries", lambda texts: pytest.fail("unexpected embedding call"))
+    monkeypatch.setattr(tools, "get_vectorstore", lambda: object())
+    assert tools.embed_disease_queries(["hello", "chest pain"]) == {}
+    monkeypatch.setattr(tools, "get_vectorstore", lambda: None)
+    assert tools.embed_disease_queries(["what is asthma"]) == {}
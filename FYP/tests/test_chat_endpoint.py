@@ -0,0 +1,35 @@
+import os
+import time
+import asyncio
+
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")  # api.py builds its Gemini client at import (no calls made)
+
+import api
+
+
+def test_concurrent_chats_keep_the_history_in_whole_exchanges(monkeypatch):
+    monkeypatch.setattr(api, "chat_history", [])
+    seen = []
+
+    def slow_agent(message, history):
+        seen.append(len(history))
+        time.sleep(0.05 * (int(message.split()[-1]) % 3))  # finish out of order
+        return f"answer to {message}"
+
+    monkeypatch.setattr(api, "_run_agent", slow_agent)
+
+    async def chat_concurrently():
+        queries = [api.UserQuery(message=f"question {i}") for i in range(8)]
+        return await asyncio.gather(*(api.chat_endpoint(q) for q in queries))
+
+    replies = asyncio.run(chat_concurrently())
+    assert [r["text"] for r in replies] == [f"answer to question {i}" for i in range(8)]
+
+    contents = [m.content for m in api.chat_history]
+    assert len(contents) == 16
+    for question, answer in zip(contents[::2], contents[1::2]):
+        assert answer == f"answer to {question}"  # each exchange stays together
+
+    asyncio.run(api.chat_endpoint(api.UserQuery(message="question 9")))
+    assert len(api.chat_history) == 12  # trimmed to the last 10 messages, plus the new exchange
+    assert all(n % 2 == 0 and n <= 10 for n in seen)
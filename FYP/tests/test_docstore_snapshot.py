@@ -0,0 +1,47 @@
+import os
+
+from langchain_community.embeddings import FakeEmbeddings
+from langchain_community.vectorstores import FAISS
+
+from medibot_core.docstore import SnapshotDocstore, build_docstore_snapshot, load_faiss_from_snapshot
+from medibot_core.snapshot import open_snapshot
+
+TEXTS = [
+    "DISEASE: ASTHMA\nSYMPTOMS: Shortness of breath, wheezing.",
+    "DISEASE: MIGRAINE\nSYMPTOMS: Throbbing headache, nausea.",
+    "DISEASE: ECZEMA\nSYMPTOMS: Itchy, inflamed skin — ünïcödé ✓",
+]
+
+
+def test_docstore_round_trip(tmp_path):
+    embeddings = FakeEmbeddings(size=16)
+    original = FAISS.from_texts(TEXTS, embeddings, metadatas=[{"source": "diseases.txt", "row": i} for i in range(3)])
+    original.save_local(str(tmp_path))
+    index_pkl = os.path.join(tmp_path, "index.pkl")
+    snap_path = os.path.join(tmp_path, "docstore.snap")
+    build_docstore_snapshot(index_pkl, snap_path)
+
+    snapshot = open_snapshot(snap_path, "docstore", index_pkl)
+    assert snapshot is not None
+    docstore = SnapshotDocstore(snapshot)
+    for i in range(len(TEXTS)):
+        expected = original.docstore.search(original.index_to_docstore_id[i])
+        got = docstore.search(i)
+        assert got.page_content == expected.page_content
+        assert got.metadata == expected.metadata
+    assert docstore.search(len(TEXTS)) == f"ID {len(TEXTS)} not found."
+
+    loaded = load_faiss_from_snapshot(os.path.join(tmp_path, "index.faiss"), snapshot, embeddings)
+    query = embeddings.embed_query("wheezing")
+    assert [d.page_content for d in loaded.similarity_search_by_vector(query, k=3)] == \
+        [d.page_content for d in original.similarity_search_by_vector(query, k=3)]
+
+
+def test_stale_docstore_snapshot_is_ignored(tmp_path):
+    FAISS.from_texts(TEXTS, FakeEmbeddings(size=16)).save_local(str(tmp_path))
+    index_pkl = os.path.join(tmp_path, "index.pkl")
+    snap_path = os.path.join(tmp_path, "docstore.snap")
+    build_docstore_snapshot(index_pkl, snap_path)
+
+    FAISS.from_texts(TEXTS[:2], FakeEmbeddings(size=16)).save_local(str(tmp_path))  # index rebuilt
+    assert open_snapshot(snap_path, "docstore", index_pkl) is None
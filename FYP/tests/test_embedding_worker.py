@@ -0,0 +1,80 @@
+import time
+import threading
+
+import numpy as np
+import pytest
+
+from medibot_core.embeddings import EmbeddingWorker
+
+
+class FakeModel:
+    """Stands in for SentenceTransformer in the worker process (spawned, so module-level).
+
+    Each row is [text length, texts in the forward pass that encoded it, torch threads].
+    """
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def encode(self, texts, batch_size, convert_to_numpy):
+        import torch
+        if "boom" in texts:
+            raise ValueError("cannot encode")
+        return np.array([[len(t), len(texts), torch.get_num_threads()] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def worker():
+    w = EmbeddingWorker("fake", num_threads=3, window=0.2, max_batch=8, load_model=FakeModel)
+    yield w
+    w.close()
+
+
+def test_concurrent_calls_share_forward_passes(worker):
+    worker.encode("warmup")  # wait for the worker to start
+    results = {}
+
+    def call(i):
+        texts = ["x" * (10 * i + j + 1) for j in range(i % 3 + 1)]
+        results[i] = (texts, worker.encode(texts))
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    for texts, vectors in results.values():
+        assert vectors[:, 0].tolist() == [len(t) for t in texts]  # each caller got its own rows
+        assert (vectors[:, 2] == 3).all()                          # torch limited to num_threads
+    pass_sizes = [v[0, 1] for _, v in results.values()]
+    assert max(pass_sizes) > 3    # calls from different threads were merged
+    assert max(pass_sizes) <= 8 + 2  # stops collecting once max_batch is reached
+
+
+def test_encode_contract(worker):
+    assert worker.encode("abc").tolist() == [3, 1, 3]
+    assert worker.encode(["a", "bb"]).shape == (2, 3)
+    assert worker.encode([]).shape == (0, 0)
+    norms = np.linalg.norm(worker.encode(["a", "bb"], normalize=True), axis=1)
+    assert np.allclose(norms, 1)
+
+
+def test_model_errors_reach_the_caller(worker):
+    with pytest.raises(RuntimeError, match="cannot encode"):
+        worker.encode(["fine", "boom"])
+    assert worker.encode("still works").tolist() == [11, 1, 3]
+
+
+def test_encode_fails_fast_once_the_worker_is_gone(worker):
+    worker.encode("warmup")
+    worker._process.terminate()
+    worker._process.join(timeout=10)
+    assert not worker._process.is_alive()
+
+    start = time.monotonic()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            worker.encode("chest pain")
+    assert time.monotonic() - start < 5  # no waiting for EMBED_TIMEOUT
+    assert worker._pending == {}
@@ -0,0 +1,159 @@
+import os
+
+import pytest
+
+from medibot_core.hot_reload import HotResource, ResourceWatcher
+
+_version = [0]
+
+
+def _write(path, text):
+    """Write a new version with a distinct mtime, even on coarse-mtime filesystems."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    _version[0] += 1
+    stamp = 1_700_000_000_000_000_000 + _version[0] * 1_000_000_000
+    os.utime(path, ns=(stamp, stamp))
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if text.startswith("broken"):
+        raise ValueError("unparseable")
+    return text
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / "data.txt")
+    _write(path, "v1")
+    return path
+
+
+@pytest.fixture
+def resource(source):
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return _read(source)
+
+    res = HotResource("test data", [source], loader)
+    res.loads = loads
+    assert res.get() == "v1"
+    return res
+
+
+def test_reloads_only_after_two_stable_polls(resource, source):
+    assert resource.reload_if_changed() is False  # nothing changed
+    _write(source, "v2")
+    assert resource.reload_if_changed() is False  # first sighting: wait for it to settle
+    assert resource.get() == "v1"
+    assert resource.reload_if_changed() is True
+    assert resource.get() == "v2"
+    assert len(resource.loads) == 2
+
+
+def test_still_changing_files_are_not_loaded(resource, source):
+    _write(source, "v2")
+    assert resource.reload_if_changed() is False
+    _write(source, "v3")  # changed again between polls
+    assert resource.reload_if_changed() is False
+    assert resource.get() == "v1"
+    assert resource.reload_if_changed() is True
+    assert resource.get() == "v3"
+
+
+def test_broken_version_is_skipped_until_fixed(resource, source):
+    _write(source, "broken v2")
+    resource.reload_if_changed()
+    assert resource.reload_if_changed() is False
+    assert resource.get() == "v1"
+    loads = len(resource.loads)
+    for _ in range(3):
+        assert resource.reload_if_changed() is False
+    assert len(resource.loads) == loads  # not retried while the files are unchanged
+
+    _write(source, "v3")
+    resource.reload_if_changed()
+    assert resource.reload_if_changed() is True
+    assert resource.get() == "v3"
+
+
+def test_rollback_restores_previous_version_until_files_change(resource, source):
+    assert resource.rollback() is False  # nothing to go back to
+    _write(source, "v2")
+    resource.reload_if_changed()
+    resource.reload_if_changed()
+    assert resource.get() == "v2"
+
+    assert resource.rollback() is True
+    assert resource.get() == "v1"
+    for _ in range(3):
+        assert resource.reload_if_changed() is False  # the rolled-back files aren't reloaded
+    assert resource.get() == "v1"
+    assert resource.rollback() is False
+
+    _write(source, "v3")
+    resource.reload_if_changed()
+    assert resource.reload_if_changed() is True
+    assert resource.get() == "v3"
+
+
+def test_keeps_a_bounded_history(source):
+    res = HotResource("test data", [source], lambda: _read(source), keep=1)
+    res.get()
+    for v in ("v2", "v3"):
+        _write(source, v)
+        res.reload_if_changed()
+        res.reload_if_changed()
+    assert res.rollback() is True
+    assert res.get() == "v2"
+    assert res.rollback() is False  # v1 was dropped
+
+
+def test_optional_paths(source, tmp_path):
+    snapshot = str(tmp_path / "data.snap")
+    res = HotResource("test data", [source], lambda: _read(source), optional_paths=[snapshot])
+    assert res.get() == "v1"  # absent optional path is fine
+    assert res.reload_if_changed() is False
+
+    _write(snapshot, "compiled")  # appearing is a change
+    res.reload_if_changed()
+    assert res.reload_if_changed() is True
+
+    os.remove(snapshot)  # and so is going away again
+    res.reload_if_changed()
+    assert res.reload_if_changed() is True
+
+
+def test_missing_required_path_is_not_reloaded(resource, source):
+    os.remove(source)
+    for _ in range(3):
+        assert resource.reload_if_changed() is False
+    assert resource.get() == "v1"
+
+
+def test_optional_resource_loads_as_none(tmp_path):
+    missing = str(tmp_path / "missing.txt")
+    assert HotResource("test data", [missing], lambda: _read(missing), optional=True).get() is None
+    with pytest.raises(FileNotFoundError):
+        HotResource("test data", [missing], lambda: _read(missing)).get()
+
+
+def test_watcher_polls_every_resource(resource, source, tmp_path):
+    other = str(tmp_path / "other.txt")
+    _write(other, "a")
+    second = HotResource("other data", [other], lambda: _read(other))
+    second.get()
+    watcher = ResourceWatcher([resource, second], interval=0)
+
+    _write(source, "v2")
+    _write(other, "b")
+    watcher.poll_once()
+    watcher.poll_once()
+    assert (resource.get(), second.get()) == ("v2", "b")
+
+    watcher.start()
+    assert watcher._thread is None  # interval 0 disables polling
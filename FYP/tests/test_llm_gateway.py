@@ -0,0 +1,208 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from medibot_core import resources
+from medibot_core.llm_gateway import LLMGateway, llm_priority
+
+
+def _fast_gateway(**kwargs) -> LLMGateway:
+    params = dict(rpm=6000, burst=10, max_retries=3, backoff_base=0.01, backoff_max=0.05)
+    params.update(kwargs)
+    return LLMGateway(**params)
+
+
+# =============================
+# LLMGateway
+# =============================
+def test_interactive_calls_jump_the_batch_queue():
+    gateway = LLMGateway(rpm=120, burst=1)  # one token every 0.5 s
+    gateway.call("warmup", lambda: None)    # bucket is now empty
+    order = []
+
+    def submit(key, priority, delay=0.0):
+        time.sleep(delay)
+        with llm_priority(priority):
+            gateway.call(key, lambda: order.append(key))
+
+    threads = [threading.Thread(target=submit, args=(f"batch{i}", "batch")) for i in range(2)]
+    threads.append(threading.Thread(target=submit, args=("interactive", "interactive", 0.1)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert order == ["interactive", "batch0", "batch1"]
+
+
+def test_retries_resource_exhausted_then_succeeds():
+    gateway = _fast_gateway()
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+    assert gateway.call("k", flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_gives_up_after_max_retries():
+    gateway = _fast_gateway(max_retries=2)
+    attempts = []
+
+    def always_exhausted():
+        attempts.append(1)
+        raise google_exceptions.ResourceExhausted("quota")
+
+    with pytest.raises(google_exceptions.ResourceExhausted):
+        gateway.call("k", always_exhausted)
+    assert len(attempts) == 3
+
+
+def test_does_not_retry_other_errors():
+    gateway = _fast_gateway()
+    attempts = []
+
+    def bad_request():
+        attempts.append(1)
+        raise google_exceptions.InvalidArgument("bad prompt")
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        gateway.call("k", bad_request)
+    assert len(attempts) == 1
+
+
+def test_backoff_drains_the_bucket():
+    gateway = _fast_gateway(rpm=60, burst=5, max_retries=1, backoff_base=0.0)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise google_exceptions.ResourceExhausted("quota")
+        return "ok"
+
+    start = time.monotonic()
+    assert gateway.call("k", flaky) == "ok"
+    assert time.monotonic() - start >= 0.9  # the retry waited for a fresh token (1/s)
+
+
+def test_identical_in_flight_calls_are_coalesced():
+    gateway = _fast_gateway()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.3)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(gateway.call("same", slow))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert gateway.call("same", lambda: "fresh") == "fresh"  # nothing in flight any more
+
+
+# =============================
+# Against a local fake Gemini REST server
+# =============================
+class _FakeGemini(BaseHTTPRequestHandler):
+    """generateContent that echoes the last user message; answers 429 while `failures` > 0."""
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((self.path, body))
+            failing = server.failures > 0
+            server.failures -= failing
+        time.sleep(server.delay)
+
+        if failing:
+            status = 429
+            payload = {"error": {"code": 429, "message": "Resource has been exhausted", "status": "RESOURCE_EXHAUSTED"}}
+        else:
+            status = 200
+            text = body["contents"][-1]["parts"][0]["text"]
+            payload = {"candidates": [{
+                "content": {"role": "model", "parts": [{"text": f"echo: {text}"}]},
+                "finishReason": "STOP",
+                "index": 0,
+            }]}
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_gemini():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeGemini)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.failures = 0
+    server.delay = 0.0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def llm(fake_gemini, monkeypatch):
+    host, port = fake_gemini.server_address
+    monkeypatch.setattr(resources, "LLM_ENDPOINT", f"http://{host}:{port}")
+    monkeypatch.setattr(resources, "GOOGLE_API_KEY", "test-key")
+    gateway = _fast_gateway()
+    monkeypatch.setattr(resources, "get_llm_gateway", lambda: gateway)
+    return resources.get_llm.__wrapped__()  # a fresh client, built like the shared one
+
+
+def test_llm_talks_to_configured_endpoint(llm, fake_gemini):
+    assert llm.invoke("hello").content == "echo: hello"
+    assert len(fake_gemini.requests) == 1
+
+
+def test_llm_retries_quota_errors(llm, fake_gemini):
+    fake_gemini.failures = 2
+    assert llm.invoke("hello").content == "echo: hello"
+    assert len(fake_gemini.requests) == 3
+
+
+def test_llm_streaming_goes_through_the_gateway(llm, fake_gemini):
+    chunks = list(llm.stream("hello"))
+    assert "".join(c.content for c in chunks) == "echo: hello"
+    (path, _), = fake_gemini.requests
+    assert path.split("?")[0].endswith(":generateContent")  # one non-streaming call, through _generate
+
+
+def test_llm_coalesces_identical_prompts(llm, fake_gemini):
+    fake_gemini.delay = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(llm.invoke("same question").content)) for _ in range(4)]
+    threads.append(threading.Thread(target=lambda: results.append(llm.invoke("other question").content)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == ["echo: other question"] + ["echo: same question"] * 4
+    assert len(fake_gemini.requests) == 2
@@ -0,0 +1,138 @@
+import os
+import shutil
+import struct
+
+import numpy as np
+import pytest
+
+from medibot_core.config import DOCTORS_CSV
+from medibot_core.doctors import DoctorDirectory, _read_doctors_csv, build_doctors_snapshot
+from medibot_core.snapshot import FORMAT_VERSION, MAGIC, Snapshot, open_snapshot, snapshot_file, write_snapshot
+
+FIELDS = ("name", "specialty", "city", "address", "phone", "priority")
+
+
+@pytest.fixture
+def doctors_csv(tmp_path):
+    path = str(tmp_path / "doctors.csv")
+    shutil.copyfile(DOCTORS_CSV, path)
+    return path
+
+
+@pytest.fixture
+def doctors_snap(doctors_csv, tmp_path):
+    path = str(tmp_path / "doctors.snap")
+    build_doctors_snapshot(doctors_csv, path)
+    return path
+
+
+def _reference_find(rows, specialty, city, limit):
+    """The original CSV lookup: priority order, exact city, specialty substring."""
+    spec = (specialty or "").strip().lower()
+    ranked = sorted(rows, key=lambda r: -r["priority"])
+    hits = [r for r in ranked if (not city or r["city"].lower() == city) and (not spec or spec in r["specialty"].lower())]
+    return [{f: r[f] for f in FIELDS} for r in hits[:max(1, min(limit, 100))]]
+
+
+def test_snapshot_lookups_match_csv(doctors_csv, doctors_snap):
+    rows = _read_doctors_csv(doctors_csv)
+    from_csv = DoctorDirectory.from_csv(doctors_csv)
+    from_snap = DoctorDirectory.from_snapshot(open_snapshot(doctors_snap, "doctors", doctors_csv))
+
+    assert len(from_snap) == len(rows)
+    assert from_snap.cities == from_csv.cities
+    assert from_snap.specialties == from_csv.specialties
+
+    specialties = [None, "", "cardio", "ent", "ist", "nosuch"] + from_csv.specialties
+    cities = [None, "", "Lahore", "islamabd", "Nowhere"] + from_csv.cities
+    queries = [(s, c, limit) for s in specialties for c in cities for limit in (1, 3, 20, 500)]
+    expected = [_reference_find(rows, s, from_csv.resolve_city(c), limit) for s, c, limit in queries]
+
+    for directory in (from_csv, from_snap):
+        got = [[{f: r[f] for f in FIELDS} for r in result] for result in directory.find_batch(queries)]
+        assert got == expected
+    for s in from_csv.specialties:
+        assert from_snap.cities_for(s) == from_csv.cities_for(s)
+
+
+def test_snapshot_layout(doctors_snap):
+    snap = Snapshot(doctors_snap)
+    assert snap.kind == "doctors"
+    assert snap["priority"].dtype == np.int8
+    assert not snap["priority"].flags.writeable  # used in place from the mmap
+    assert all(c["offset"] % 8 == 0 for c in snap.header["columns"].values())
+    city_names = list(snap["city_names"])
+    assert len(city_names) == len(set(city_names))  # interned: each city stored once
+
+
+def test_stale_snapshot_falls_back_to_source(doctors_csv, doctors_snap):
+    assert open_snapshot(doctors_snap, "doctors", doctors_csv) is not None
+    with open(doctors_csv, "a", encoding="utf-8") as f:
+        f.write("Dr. New Doctor,Cardiologist,Sialkot,Sialkot Address 1,000-0000000,5\n")
+    assert open_snapshot(doctors_snap, "doctors", doctors_csv) is None
+    assert "sialkot" in DoctorDirectory.from_csv(doctors_csv).cities
+
+
+def test_missing_wrong_kind_or_version_is_ignored(doctors_csv, doctors_snap, tmp_path):
+    assert open_snapshot(str(tmp_path / "missing.snap"), "doctors", doctors_csv) is None
+    assert open_snapshot(doctors_snap, "docstore", doctors_csv) is None
+
+    with open(snapshot_file(doctors_snap), "r+b") as f:
+        f.seek(len(MAGIC))
+        f.write(struct.pack("<I", FORMAT_VERSION + 1))
+    assert open_snapshot(doctors_snap, "doctors", doctors_csv) is None
+
+    os.remove(snapshot_file(doctors_snap))  # pointer to a missing data file
+    assert open_snapshot(doctors_snap, "doctors", doctors_csv) is None
+    with open(doctors_snap, "wb") as f:
+        f.write(b"garbage")
+    assert open_snapshot(doctors_snap, "doctors", doctors_csv) is None
+
+
+def _write_version(path, source, n):
+    write_snapshot(path, "test", {"n": np.full(4, n, dtype=np.int32)}, {"s": [f"v{n}"]}, source=source)
+
+
+def test_rebuild_while_mapped(doctors_csv, tmp_path):
+    path = str(tmp_path / "test.snap")
+    _write_version(path, doctors_csv, 1)
+    old = Snapshot(path)
+    _write_version(path, doctors_csv, 2)  # old version still mapped
+
+    assert old["n"].tolist() == [1] * 4 and list(old["s"]) == ["v1"]
+    new = Snapshot(path)
+    assert new["n"].tolist() == [2] * 4 and list(new["s"]) == ["v2"]
+    assert sorted(os.listdir(tmp_path)) == sorted(["doctors.csv", "test.snap", os.path.basename(snapshot_file(path))])
+
+
+def test_mapped_versions_that_cannot_be_deleted_are_left_for_later(doctors_csv, tmp_path, monkeypatch):
+    path = str(tmp_path / "test.snap")
+    _write_version(path, doctors_csv, 1)
+    mapped = snapshot_file(path)
+    real_remove = os.remove
+
+    def remove(p):
+        if p == mapped:
+            raise PermissionError(f"{p} is mapped")  # what Windows does
+        real_remove(p)
+
+    monkeypatch.setattr(os, "remove", remove)
+    _write_version(path, doctors_csv, 2)
+    assert os.path.exists(mapped)
+    assert list(Snapshot(path)["s"]) == ["v2"]
+
+    monkeypatch.setattr(os, "remove", real_remove)
+    _write_version(path, doctors_csv, 3)
+    assert not os.path.exists(mapped)
+    assert list(Snapshot(path)["s"]) == ["v3"]
+
+
+def test_string_columns_round_trip(doctors_csv, tmp_path):
+    path = str(tmp_path / "strings.snap")
+    values = ["", "plain", "ünïcödé ✓", "x" * 1000, ""]
+    write_snapshot(path, "test", {"n": np.arange(3, dtype=np.int16)}, {"s": values, "empty": []}, source=doctors_csv)
+    snap = Snapshot(path)
+    assert list(snap["s"]) == values
+    assert snap["s"][-1] == "" and snap["s"][1:3] == values[1:3]
+    assert len(snap["empty"]) == 0
+    assert snap["n"].tolist() == [0, 1, 2]
@@ -0,0 +1,142 @@
+import re
+
+import numpy as np
+import pytest
+
+from medibot_core.config import DISEASES_TXT
+from medibot_core.specialty_classifier import (
+    OTHER, SpecialtyClassifier, directory_specialties, load_training_data, train,
+)
+
+# Cases the old SPECIALTY_KEYWORDS table (api.py) answered correctly.
+KEYWORD_CASES = {
+    "Cardiologist": [
+        "chest pain", "chest tight", "chest pressure", "heart", "palpitation", "cardiac", "high blood pressure",
+        "hypertension", "angina",
+    ],
+    "Pulmonologist": ["breathing", "breath", "wheezing", "asthma", "cough", "lungs", "copd", "pneumonia"],
+    "Neurologist": ["headache", "migraine", "seizure", "stroke", "numb", "tingling", "dizziness", "brain"],
+    "Dentist": ["tooth", "teeth", "toothache", "gum", "cavity", "jaw pain"],
+    "Dermatologist": ["skin", "rash", "acne", "eczema", "itch", "hives"],
+    "ENT Specialist": ["ear", "throat", "tonsil", "sinus", "nose", "hearing", "ear pain", "sore throat"],
+    "Orthopedic Surgeon": ["knee", "joint", "bone", "fracture", "back pain", "shoulder", "sprain"],
+    "Gynecologist": ["pregnancy", "period", "menstrual", "vaginal", "pelvic pain"],
+    "Pediatrician": ["baby", "infant", "child", "kid", "vaccination"],
+    "Urologist": ["urine", "urinary", "kidney", "bladder", "prostate", "burning urine"],
+    "Endocrinologist": ["diabetes", "thyroid", "hormone"],
+    "Psychiatrist": ["anxiety", "depression", "panic", "stress", "insomnia"],
+}
+
+# Split between two sections of the encyclopedia (arrhythmia vs vertigo, childhood infections vs
+# skin conditions, "hyper-" stems), so only "never the wrong one" is checked for them.
+AMBIGUOUS = {"dizziness", "rash", "hypertension"}
+
+SENTENCE_CASES = [
+    ("ear pain and sore throat", "ENT Specialist"),
+    ("swollen tonsils and sore throat", "ENT Specialist"),
+    ("blocked nose and sinus pain", "ENT Specialist"),
+    ("panic attacks and can't sleep", "Psychiatrist"),
+    ("I have chest pain and my heart is racing", "Cardiologist"),
+    ("chest pain, cardiologist in Lahore", "Cardiologist"),
+    ("my child has a rash and fever", "Pediatrician"),
+    ("I keep coughing and wheezing", "Pulmonologist"),
+    ("I found a lump in my breast", "Oncologist"),
+    ("burning when I urinate", "Urologist"),
+    ("I have a toothache", "Dentist"),
+    ("itchy red rash on my skin", "Dermatologist"),
+    ("irregular periods and cramps", "Gynecologist"),
+]
+
+# Everyday complaints (GENERAL MEDICINE in the encyclopedia) must not send anyone to a specialist.
+GENERIC_CASES = [
+    "I have a fever", "fever", "nausea", "vomiting", "nausea and vomiting", "fatigue", "I feel tired",
+    "I have a cold", "flu", "cold and flu", "I have a cough and fever",
+]
+
+
+@pytest.fixture(scope="module")
+def clf():
+    return train()
+
+
+KEYWORDS = [(kw, specialty) for specialty, kws in KEYWORD_CASES.items() for kw in kws]
+
+
+@pytest.mark.parametrize("text,expected", [(kw, s) for kw, s in KEYWORDS if kw not in AMBIGUOUS])
+def test_top_suggestion_matches_old_keyword_table(clf, text, expected):
+    assert clf.predict(text, k=1)[0][0] == expected
+
+
+@pytest.mark.parametrize("text,expected", KEYWORDS)
+def test_never_suggests_another_specialty_than_old_keyword_table(clf, text, expected):
+    assert clf.infer_specialty(text) in (expected, None)
+
+
+@pytest.mark.parametrize("text,expected", SENTENCE_CASES)
+def test_infers_specialty(clf, text, expected):
+    assert clf.infer_specialty(text) == expected
+
+
+@pytest.mark.parametrize("text", GENERIC_CASES)
+def test_no_specialty_for_generic_symptoms(clf, text):
+    assert clf.infer_specialty(text) is None
+
+
+def test_labels_are_directory_specialties(clf):
+    specialties = [s for s in clf.specialties if not s.startswith(OTHER)]
+    assert specialties == directory_specialties()
+    assert f"{OTHER}: General Medicine" in clf.specialties
+
+
+@pytest.mark.parametrize("text", ["stomach pain", "blurry vision", "weight loss diet", "pain", "xyzzy pain", "hello"])
+def test_no_specialty_for_uncovered_or_unknown_text(clf, text):
+    assert clf.infer_specialty(text) is None
+
+
+def test_unknown_words_lower_confidence(clf):
+    (_, known), = clf.predict("knee pain", k=1)
+    (_, diluted), = clf.predict("xyzzy pain", k=1)
+    assert diluted < known
+
+
+def test_never_lists_other(clf):
+    listed = clf.predict("stomach ache and acid reflux", k=len(clf.specialties))
+    assert listed and not any(name.startswith(OTHER) for name, _ in listed)
+
+
+def test_scores_are_calibrated_on_held_out_diseases(tmp_path):
+    """Train without every third disease, then score those diseases' symptoms (expected calibration error)."""
+    with open(DISEASES_TXT, encoding="utf-8") as f:
+        blocks = re.split(r"\n(?=DISEASE:|===)", f.read())
+    diseases = [b for b in blocks if b.startswith("DISEASE:")]
+    held_out = {b.splitlines()[0][len("DISEASE:"):].strip() for b in diseases[2::3]}
+    path = tmp_path / "diseases.txt"
+    path.write_text("\n".join(b for b in blocks if b not in diseases[2::3]), encoding="utf-8")
+    held_out_clf = train(str(path))
+
+    labels, examples = load_training_data()
+    confidence, correct = [], []
+    for text, label, disease in examples:
+        if disease in held_out and text != disease:
+            top = held_out_clf.predict(text, k=1)
+            if top:
+                confidence.append(top[0][1])
+                correct.append(top[0][0] == labels[label])
+    confidence, correct = np.array(confidence), np.array(correct, dtype=float)
+    assert len(confidence) > 100
+
+    bins = np.minimum((confidence * 10).astype(int), 9)
+    ece = sum(
+        (bins == i).mean() * abs(correct[bins == i].mean() - confidence[bins == i].mean())
+        for i in range(10) if (bins == i).any()
+    )
+    assert ece < 0.2
+    assert confidence.mean() <= correct.mean() + 0.05  # not overconfident on text it never saw
+
+
+def test_save_load_round_trip(clf, tmp_path):
+    path = str(tmp_path / "clf.npz")
+    clf.save(path)
+    loaded = SpecialtyClassifier.load(path)
+    assert loaded.specialties == clf.specialties
+    assert loaded.predict("sore throat and ear pain") == clf.predict("sore throat and ear pain")
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from medibot_core import speculation, tools
+from medibot_core.speculation import speculate, speculative_result
+from medibot_core.tools import disease_info, doctor_lookup, likely_tool_calls
+
+
+def test_uses_finished_speculation():
+    calls = []
+    with speculate([("tool", "k", lambda: calls.append("bg") or "bg", ())]) as futures:
+        futures[("tool", "k")].result()
+        assert speculative_result("tool", "k", lambda: "inline") == "bg"
+    assert calls == ["bg"]
+
+
+def test_runs_inline_when_speculation_is_still_queued():
+    release = threading.Event()
+    blockers = [speculation._pool.submit(release.wait) for _ in range(speculation.SPECULATION_WORKERS)]
+    try:
+        ran = []
+        with speculate([("tool", "k", lambda: ran.append("bg") or "bg", ())]):
+            assert speculative_result("tool", "k", lambda: "inline") == "inline"
+    finally:
+        release.set()
+        for b in blockers:
+            b.result()
+    assert ran == []  # the queued copy was cancelled, not run later
+
+
+def test_without_matching_speculation_runs_inline():
+    with speculate([("tool", "other", lambda: "bg", ())]):
+        assert speculative_result("tool", "k", lambda: "inline") == "inline"
+    assert speculative_result("tool", "k", lambda: "inline") == "inline"
+
+
+# =============================
+# Speculated keys match what the tools look up
+# =============================
+@pytest.fixture
+def tool_keys(monkeypatch):
+    """(tool_name, key) each tool asks speculative_result for."""
+    keys = []
+    monkeypatch.setattr(tools, "speculative_result", lambda name, key, fn, *args: keys.append((name, key)) or {})
+    return keys
+
+
+def _speculated(message, tool_name):
+    keys = [(name, key) for name, key, _, _ in likely_tool_calls(message) if name == tool_name]
+    assert len(keys) == 1
+    return keys[0]
+
+
+@pytest.mark.parametrize("message, specialty, city", [
+    ("chest pain, cardiologist in Lahore", "Cardiologist", "lahore"),
+    ("chest pain, cardiologist in Lahore", "cardio", "Lahore"),
+    ("I need a dentist in Islamabad for a toothache", "Dentist", "islamabad"),
+])
+def test_doctor_lookup_key_matches_speculation(tool_keys, message, specialty, city):
+    speculated = _speculated(message, "doctor_lookup")
+    doctor_lookup.invoke({"user_specialty": specialty, "city": city})
+    assert tool_keys == [speculated]
+
+
+@pytest.mark.parametrize("message, query", [
+    ("What is asthma?", "asthma"),
+    ("tell me about the Migraine", "Migraine"),
+    ("Can you give me information on type 2 diabetes", "Type 2 Diabetes"),
+])
+def test_disease_info_key_matches_speculation(tool_keys, message, query):
+    speculated = _speculated(message, "disease_info")
+    disease_info.invoke({"query": query})
+    assert tool_keys == [speculated]